@@ -0,0 +1,169 @@
+from core.card import codes_to_cards
+from core.sampler import deck_codes, sample_hands
+from core.trials import hands_trial, get_classifier
+from core.profiling import PhaseTimer
+from core import hands
+from contextlib import redirect_stdout
+from time import perf_counter
+import main
+import numpy as np
+import argparse
+import io
+import json
+import os
+import tempfile
+
+# Benchmarks of the hot paths of the experiments, every line reports how many hands (or cards) per second
+# a piece of code gets through on a deck of a given number of suits, for every engine that can do it.
+#   python benchmark.py                       all benchmarks on 1, 4 and 10 suits
+#   python benchmark.py --json now.json       also saves the numbers
+#   python benchmark.py --baseline now.json   compares with saved numbers and marks the regressions
+# Every measurement is the best of a few repeats, timed with perf_counter.
+
+SUITS = (1, 4, 10)
+REPEATS = 3
+# a result this much slower than the baseline is reported as a regression
+TOLERANCE = 0.1
+
+
+# runs function() (which handles amount hands) a few times and returns the best hands per second
+def measure(function, amount, repeats=REPEATS):
+    best = float('inf')
+    for _ in range(repeats):
+        start = perf_counter()
+        function()
+        best = min(best, perf_counter() - start)
+    return amount / best
+
+
+def bench_shuffle(suit, amount):
+    results = {}
+    for name, engine in main.DECK_ENGINES.items():
+        deck = engine(1, 13, suit, seed=1)
+        results[(name, 'full')] = measure(lambda: [deck.shuffle() for _ in range(amount)], amount)
+        results[(name, 'top=5')] = measure(lambda: [deck.shuffle(top=5) for _ in range(amount)], amount)
+    return results
+
+
+def bench_draw_place(suit, amount):
+    results = {}
+    for name, engine in main.DECK_ENGINES.items():
+        deck = engine(1, 13, suit, seed=1)
+
+        def cycle():
+            for _ in range(amount):
+                deck.place_cards(deck.draw_cards())
+        results[(name, 'draw+place')] = measure(cycle, amount)
+    # the batch engine deals whole experiments at once, shuffle included
+    codes = deck_codes(1, 13, suit)
+    rng = np.random.default_rng(1)
+    results[('batch', 'sample_hands')] = measure(lambda: sample_hands(codes, amount, rng=rng), amount)
+    return results
+
+
+def bench_classifiers(suit, amount):
+    results = {}
+    dealt = sample_hands(deck_codes(1, 13, suit), amount, rng=np.random.default_rng(1))
+    cards = [codes_to_cards(hand) for hand in dealt]
+    for check in (main.is_flush, main.is_pair, main.is_royal_flush):
+        results[('list', check.__name__)] = measure(lambda: [check(hand) for hand in cards], amount)
+        # the array engine hands its codes to the same functions
+        results[('array', check.__name__)] = measure(lambda: [check(hand) for hand in dealt], amount)
+    classifier = get_classifier(suit)
+    name = 'evaluator' if classifier is not hands else 'batch'
+    results[(name, 'flush_mask')] = measure(lambda: classifier.flush_mask(dealt), amount)
+    results[(name, 'pair_mask')] = measure(lambda: classifier.pair_mask(dealt), amount)
+    results[(name, 'royal_flush_mask')] = measure(lambda: classifier.royal_flush_mask(dealt, suit=0), amount)
+    return results
+
+
+# a whole chances_of_hands run without charts or results store, what it prints is dropped
+def quiet_chances_of_hands(suit, **kwargs):
+    with redirect_stdout(io.StringIO()):
+        main.chances_of_hands(suit, seed=1, plots='off', results='off', **kwargs)
+
+
+def bench_experiments(suit, amount):
+    results = {}
+    experiments = 10
+    for engine in list(main.DECK_ENGINES) + [main.BATCH_ENGINE]:
+        # the card by card engines are a lot slower, they deal fewer hands
+        attempts = max((amount if engine == main.BATCH_ENGINE else amount // 10) // experiments, 1)
+        results[(engine, 'chances_of_hands')] = measure(
+            lambda: quiet_chances_of_hands(suit, engine=engine, attempts=attempts, experiments=experiments),
+            attempts * experiments, repeats=1)
+    seed = np.random.SeedSequence(1)
+    results[('batch', 'hands_trial')] = measure(lambda: hands_trial((1, 13), suit, amount, seed), amount)
+    return results
+
+
+BENCHMARKS = {'shuffle': bench_shuffle, 'draw_place': bench_draw_place, 'classify': bench_classifiers,
+              'experiment': bench_experiments}
+# hands every benchmark handles per measurement, the slow ones work on less
+AMOUNTS = {'shuffle': 2000, 'draw_place': 20000, 'classify': 20000, 'experiment': 100000}
+
+
+# the per-phase breakdown of one chances_of_hands run for every engine
+def profile_phases(suit, attempts=2000, experiments=10):
+    for engine in list(main.DECK_ENGINES) + [main.BATCH_ENGINE]:
+        timer = PhaseTimer()
+        quiet_chances_of_hands(suit, engine=engine, attempts=attempts, experiments=experiments, profile=timer)
+        print('phases of chances_of_hands on the', engine, 'engine with', suit, 'suits:')
+        for line in timer.report():
+            print('    ' + line)
+
+
+def run(benchmarks, suits, scale=1.0):
+    results = {}
+    for name in benchmarks:
+        amount = max(int(AMOUNTS[name] * scale), 10)
+        for suit in suits:
+            for (engine, case), speed in BENCHMARKS[name](suit, amount).items():
+                key = '{0}/{1}/{2}/{3}'.format(name, case, engine, suit)
+                results[key] = speed
+                print('{0:<40} {1:>14,.0f} hands/s'.format(key, speed))
+    return results
+
+
+def compare(results, baseline):
+    slower = 0
+    print('compared with the baseline:')
+    for key, speed in results.items():
+        if key not in baseline:
+            continue
+        ratio = speed / baseline[key]
+        regression = ratio < 1 - TOLERANCE
+        slower += regression
+        print('{0:<40} {1:6.2f}x{2}'.format(key, ratio, '  REGRESSION' if regression else ''))
+    return slower
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmarks of the experiment hot paths in hands per second')
+    parser.add_argument('benchmarks', nargs='*', help='some of ' + ', '.join(BENCHMARKS) + ', all of them by default')
+    parser.add_argument('--suits', type=int, nargs='+', default=SUITS)
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplies the number of hands of every benchmark')
+    parser.add_argument('--profile', action='store_true', help='also break a run down into its phases')
+    parser.add_argument('--json', metavar='FILE', help='save the results')
+    parser.add_argument('--baseline', metavar='FILE', help='compare with the results saved by an earlier run')
+    options = parser.parse_args()
+    unknown = set(options.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error('unknown benchmarks ' + ', '.join(sorted(unknown)))
+    # the experiments write their logs into the working directory, the benchmark keeps them out of the way
+    with tempfile.TemporaryDirectory() as directory:
+        home = os.getcwd()
+        os.chdir(directory)
+        try:
+            results = run(options.benchmarks or list(BENCHMARKS), options.suits, options.scale)
+            if options.profile:
+                for suit in options.suits:
+                    profile_phases(suit)
+        finally:
+            os.chdir(home)
+    if options.json:
+        with open(options.json, 'w') as file:
+            json.dump(results, file, indent=1)
+    if options.baseline:
+        with open(options.baseline) as file:
+            raise SystemExit(1 if compare(results, json.load(file)) else 0)
@@ -1,2 +1,3 @@
 from core.card import Card
 from core.deck import Deck
+from core.array_deck import ArrayDeck
@@ -0,0 +1,120 @@
+from core.card import from_code, cards_to_codes, codes_to_cards
+from core.sampler import deck_codes, sample_hands
+import numpy as np
+
+# a partial shuffle (top=k) only pays off on decks of at least this many cards, smaller ones are shuffled in full
+PARTIAL_SHUFFLE_CARDS = 256
+
+
+class ArrayDeck:
+    '''
+    This is an alternative engine to the Deck class for the Monte-Carlo experiments.
+    Instead of keeping a python list of Card objects, every card is packed into one integer
+    (see core.card.encode) and the whole pile lives in a single contiguous numpy array.
+    The top of the deck is the end of the live part of the array, just like in Deck,
+    so both engines can be swapped in the experiments without changing their logic.
+    '''
+    def __init__(self, valueStart, valueEnd, numSuits, **kwargs):
+        self.pile = deck_codes(valueStart, valueEnd, numSuits)
+        self.size = len(self.pile)
+        self.rng = np.random.default_rng(kwargs.get("seed"))
+
+    def __str__(self):
+        return ','.join(str(card) for card in self)
+
+    def __len__(self):
+        return self.size
+
+    # the array is allocated once, it only needs to grow when more cards are placed than it can hold
+    def _reserve(self, amount):
+        if self.size + amount > len(self.pile):
+            grown = np.empty(max(len(self.pile) * 2, self.size + amount), dtype=self.pile.dtype)
+            grown[:self.size] = self.pile[:self.size]
+            self.pile = grown
+
+    def addCard(self, card, where):
+        if where > -1 and where <= self.size:
+            self._reserve(1)
+            # shift everything above the position one slot up, the slices overlap so numpy copies safely
+            self.pile[where + 1:self.size + 1] = self.pile[where:self.size]
+            self.pile[where] = card.code
+            self.size += 1
+        else:
+            print("I can't add there.")
+
+    # draw a card from the top of the deck, it is decoded back into a Card object
+    def drawCard(self):
+        assert not self.is_empty(), "Cannot draw from an empty deck"
+        self.size -= 1
+        return from_code(int(self.pile[self.size]))
+
+    def placeCardTop(self, card):
+        self.addCard(card, self.size)
+
+    def placeCardBottom(self, card):
+        self.addCard(card, 0)
+
+    # Shuffles only the live part of the pile in place.
+    # With top=k only the k top positions need to be random (the first k steps of a Fisher-Yates shuffle),
+    # but on a small deck one full numpy shuffle is cheaper than those k steps, so only large decks take them
+    def shuffle(self, **kwargs):
+        if "seed" in kwargs:
+            self.rng = np.random.default_rng(kwargs["seed"])
+        top = kwargs.get("top", self.size)
+        if top >= self.size - 1 or self.size < PARTIAL_SHUFFLE_CARDS:
+            self.rng.shuffle(self.pile[:self.size])
+            return
+        # position i is swapped with a random position in [0, i], all the random numbers are drawn in one call.
+        # The swaps are followed on the few positions they touch and the pile is then moved in one step
+        last, moved = self.size - 1, {}
+        for step, u in enumerate(self.rng.random(top).tolist()):
+            i, j = last - step, int(u * (self.size - step))
+            moved[i], moved[j] = moved.get(j, j), moved.get(i, i)
+        self.pile.put(list(moved), self.pile.take(list(moved.values())))
+
+    # the live part of the pile and the state of the random generator, see Deck.get_state
+    def get_state(self):
+        return self.pile[:self.size].copy(), self.rng.bit_generator.state
+
+    def set_state(self, state):
+        pile, rng = state
+        self.pile = np.array(pile, dtype=np.int64)
+        self.size = len(self.pile)
+        self.rng.bit_generator.state = rng
+
+    def is_empty(self):
+        return len(self) == 0
+
+    # Take n cards from the top and returns them as an array of codes.
+    # The result is a copy (a hand is only a few integers), it stays the same whatever happens to the deck
+    def draw_cards(self, amount=5):
+        assert not self.is_empty(), "Cannot draw from an empty deck"
+        amount = min(amount, self.size)
+        self.size -= amount
+        return self.pile[self.size:self.size + amount].copy()
+
+    # put the cards (array of codes or list of Card) on top of the deck
+    def place_cards(self, cards):
+        assert not len(cards) == 0, "Card list cannot be empty"
+        if not isinstance(cards, np.ndarray):
+            cards = cards_to_codes(cards)
+        self._reserve(len(cards))
+        self.pile[self.size:self.size + len(cards)] = cards
+        self.size += len(cards)
+
+    # Deals hand_size cards to each of the players and community cards to the table from one shuffle,
+    # like Deck.deal. Returns a (players, hand_size) array of codes and the array of community cards,
+    # both are copies so they stay valid after the next shuffle
+    def deal(self, players, hand_size=5, community=0):
+        amount = players * hand_size + community
+        assert 0 < amount <= self.size, "Not enough cards in the deck for this deal"
+        self.shuffle(top=amount)
+        cards = self.pile[self.size - amount:self.size].copy()
+        return cards[:players * hand_size].reshape(players, hand_size), cards[players * hand_size:]
+
+    # deals n hands from the cards currently in the deck without touching the pile
+    def sample_hands(self, n, hand_size=5):
+        return sample_hands(self.pile[:self.size], n, hand_size, self.rng)
+
+    def __iter__(self):
+        return iter(codes_to_cards(self.pile[:self.size]))
@@ -0,0 +1,148 @@
+from collections import OrderedDict
+from core.evaluator import CACHE_DIR
+from core.results import describe_seed
+import hashlib
+import json
+import os
+import pickle
+
+# Bump this whenever a change makes a seeded experiment return different numbers
+# (dealing, shuffling, classifying, seeding), every result cached before it is then ignored
+ENGINE_VERSION = 2
+
+RESULT_CACHE_DIR = os.path.join(CACHE_DIR, 'results')
+# the disk cache is kept below this size, the least recently used results go first
+MAX_BYTES = 256 << 20
+# an eviction goes down to this share of MAX_BYTES, so the next one is only due after many more results
+EVICT_TO = 0.9
+# how many results are also kept in memory
+MEMORY_ENTRIES = 1024
+
+
+# The key of a configuration: the hash of its canonical JSON together with the engine version,
+# so the same configuration always gives the same key, in any process and in any order of its items.
+# Seeds are written out in full, a SeedSequence with its entropy and spawn key
+def cache_key(config):
+    config = dict(config, version=ENGINE_VERSION)
+    text = json.dumps(config, sort_keys=True, default=describe_seed)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class ResultCache:
+    '''
+    Content-addressed cache of experiment results, keyed by their full configuration (see cache_key).
+    Every result is a small pickle file in directory, named by its key and written atomically.
+    A hit touches the file, so the modification times give the least recently used results,
+    and they are removed once the directory grows over max_bytes.
+    The most recently used results are also kept in memory in front of the disk.
+    '''
+    def __init__(self, directory=RESULT_CACHE_DIR, max_bytes=MAX_BYTES, memory_entries=MEMORY_ENTRIES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.memory = OrderedDict()
+        self.hits = self.misses = 0
+        # bytes in the directory, counted on the first put and then kept up to date by every put
+        self.total = None
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.pkl')
+
+    def _remember(self, key, value):
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    # the cached result of the configuration, or None
+    def get(self, config):
+        key = cache_key(config)
+        if key in self.memory:
+            self.hits += 1
+            self.memory.move_to_end(key)
+            try:
+                os.utime(self._path(key))  # keeps it recent on disk as well
+            except OSError:
+                pass
+            return self.memory[key]
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                value = pickle.load(file)
+            os.utime(path)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            # missing, or evicted by another process in the meantime
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._remember(key, value)
+        return value
+
+    def put(self, config, value):
+        key = cache_key(config)
+        self._remember(key, value)
+        path = self._path(key)
+        temp = path + '.' + str(os.getpid()) + '.tmp'
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp, 'wb') as file:
+                pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+                size = file.tell()
+            replaced = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(temp, path)
+            if self.total is not None:
+                self.total += size - replaced
+            self.evict()
+        except OSError as e:
+            # a cache that cannot be written (e.g. a read-only home) only costs the next run its time
+            print('Result cache not saved:', e)
+        return value
+
+    # Removes the least recently used results until the directory fits into max_bytes.
+    # The files are only listed when the running total says the directory is too big (and on the first put),
+    # the listing also counts what other processes have added in the meantime.
+    # It then removes down to EVICT_TO of max_bytes, so a full cache is not listed again on every put
+    def evict(self):
+        if self.total is not None and self.total <= self.max_bytes:
+            return
+        entries = []
+        with os.scandir(self.directory) as files:
+            for entry in files:
+                if entry.name.endswith('.pkl'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICT_TO if total > self.max_bytes else self.max_bytes
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+        self.total = total
+
+    # the cached result of the configuration, compute() runs and its result is saved only on a miss
+    def cached(self, config, compute):
+        value = self.get(config)
+        return self.put(config, compute()) if value is None else value
+
+    def clear(self):
+        self.memory.clear()
+        self.total = None
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith('.pkl'):
+                    os.remove(os.path.join(self.directory, name))
+
+
+# one cache per process, shared by every experiment
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = ResultCache()
+    return _cache
@@ -0,0 +1,73 @@
+import numpy as np
+import os
+import pickle
+import time
+
+
+class Checkpoint:
+    '''
+    Keeps the progress of a long experiment in a binary file, so an interrupted run can continue where it stopped.
+    The experiment hands its state (completed results, statistics, deck and random generator state)
+    to update() every time it is consistent, e.g. after each finished experiment, and calls save() as it goes.
+    update() only keeps the state it gets, nothing is copied: it should be counters, small snapshots and
+    references to lists that only grow (read back up to their counter), so updating costs the same however
+    long the run is. save() pickles the last updated state, but only when interval seconds have passed
+    since the last write unless it is forced (an interrupted run forces it on its way out).
+    The state is pickled into a temporary file first and then moved over the checkpoint in one step,
+    so a crash while saving always leaves the previous checkpoint intact.
+    on_save, when it is set, is called right before every write, e.g. to write out the results streamed so far
+    so that they match the checkpoint.
+    '''
+    def __init__(self, path, experiment, config, interval=30):
+        self.path = path
+        self.experiment = experiment
+        self.config = config
+        self.interval = interval
+        self.state = None
+        self.latest = None
+        self.saved = time.time()
+        self.on_save = None
+
+    # the state of the last checkpoint, when it belongs to the same experiment
+    def load(self):
+        if not os.path.exists(self.path):
+            return None
+        experiment, config, state = read_checkpoint(self.path)
+        if experiment != self.experiment:
+            raise ValueError(self.path + ' is a checkpoint of ' + experiment + ', not of ' + self.experiment)
+        # the stored configuration wins, the resumed run has to deal exactly the same cards
+        self.config, self.state = config, state
+        return state
+
+    def update(self, state):
+        self.latest = state
+
+    def save(self, force=False):
+        if self.latest is None or not (force or time.time() - self.saved >= self.interval):
+            return
+        if self.on_save is not None:
+            self.on_save()
+        temp = self.path + '.' + str(os.getpid()) + '.tmp'
+        with open(temp, 'wb') as file:
+            pickle.dump((self.experiment, self.config, self.latest), file, protocol=pickle.HIGHEST_PROTOCOL)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp, self.path)
+        self.saved = time.time()
+
+    # the experiment has finished, nothing is left to resume
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+# returns (experiment name, configuration, state) of a checkpoint file
+def read_checkpoint(path):
+    with open(path, 'rb') as file:
+        return pickle.load(file)
+
+
+# A run that is checkpointed needs a seed even when none was given, otherwise a resumed run
+# would not deal the same cards. It is drawn here from the operating system and saved with the checkpoint
+def fresh_seed():
+    return int(np.random.SeedSequence().entropy)
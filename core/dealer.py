@@ -0,0 +1,64 @@
+from core.sampler import sample_hands
+from core import hands as classifiers
+from itertools import combinations
+import numpy as np
+
+# Multi-player dealing. A deal (one table) gives hand_size cards to every player and puts community cards
+# on the table (Hold'em style), all from the same shuffled deck, so no card shows up twice within a deal.
+# Every deal is the top of its own fresh shuffle, so deals are independent of each other.
+# The cards are integer codes (see core.card.encode), the same arrays the classifiers of core.hands
+# and core.evaluator work on.
+
+# a poker hand is made of this many cards, with more cards the best 5 of them count
+POKER_HAND = 5
+
+
+# Deals n tables at once and returns (hands, community): hands is an (n, players, hand_size) array
+# and community an (n, community) array of card codes
+def deal_tables(codes, n, players, hand_size=2, community=0, rng=None):
+    dealt = players * hand_size
+    assert players > 0 and hand_size > 0, "Every player needs at least one card"
+    assert dealt + community <= len(codes), "Not enough cards in the deck for this table"
+    # the cards of a deal come out in the order of a random permutation, so it does not matter
+    # which of them go to which player
+    cards = sample_hands(codes, n, dealt + community, rng)
+    return cards[:, :dealt].reshape(n, players, hand_size), cards[:, dealt:]
+
+
+# the cards every player can use, their own hand and the community cards, one row per deal and player:
+# an (n * players, hand_size + community) array ready for the classifiers
+def player_cards(hands, community):
+    hands = np.asarray(hands)
+    n, players, hand_size = hands.shape
+    community = np.asarray(community).reshape(n, 1, -1)
+    cards = np.concatenate([hands, np.broadcast_to(community, (n, players, community.shape[2]))], axis=2)
+    return cards.reshape(n * players, -1)
+
+
+# every way to pick the 5 cards of a poker hand out of the columns of cards
+def _subsets(cards):
+    width = cards.shape[1]
+    assert width >= POKER_HAND, "A player needs at least " + str(POKER_HAND) + " cards for a poker hand"
+    return [cards[:, list(columns)] for columns in combinations(range(width), POKER_HAND)]
+
+
+# The core.hands category of the best 5 card hand among the cards of every row (e.g. 2 cards and 5 community
+# cards give 21 hands to choose from). Categories are numbered from the weakest hand up, so the best is the largest.
+# Works on any deck, with the evaluator (core.evaluator) it is a table lookup for the standard deck
+def best_categories(cards, evaluator=None):
+    cards = np.asarray(cards)
+    categorize = classifiers.hand_categories if evaluator is None else evaluator.category
+    return np.max([categorize(hand) for hand in _subsets(cards)], axis=0)
+
+
+# the rank of the best 5 card hand of every row, higher wins and equal ranks tie (standard deck only)
+def best_ranks(cards, evaluator):
+    return np.max([evaluator.rank(hand) for hand in _subsets(np.asarray(cards))], axis=0)
+
+
+# Which players win their table, an (n, players) mask, players that tie for the best hand all win.
+# Needs the evaluator of the standard deck, the ranks break ties between hands of the same category
+def winners(hands, community, evaluator):
+    n, players = np.shape(hands)[:2]
+    ranks = best_ranks(player_cards(hands, community), evaluator).reshape(n, players)
+    return ranks == ranks.max(axis=1, keepdims=True)
@@ -1,5 +1,6 @@
 from core.card import Card
-from random import seed,randint
+from collections import deque
+from random import Random
 
 
 class Deck:
@@ -10,44 +11,30 @@ class Deck:
     I should mention than I am using this class by referencing from
     http://moodle.vle.monash.edu/mod/assign/view.php?id=4411167
     '''
-    def __init__(self, valueStart, valueEnd, numSuits):
-        self.pile = []
-        self.size = 0
+    def __init__(self, valueStart, valueEnd, numSuits, **kwargs):
+        # every deck has its own random generator, so seeding one deck never touches the global random module
+        self.rng = Random(kwargs.get("seed"))
 
-        values = []
-
-        i = valueStart
-
-        while i <= valueEnd:
-            values.append(i)
-            i += 1
-
-        i = 0
-
-        while i < numSuits:
-            for value in values:
-                newCard = Card(value,i)
-                self.pile.append(newCard)
-                self.size += 1
-            i += 1
+        # One interned Card per (face, suit), suit by suit.
+        # The pile is a deque, cards go on and come off both ends (top and bottom) in O(1)
+        self.pile = deque(Card(value, i) for i in range(numSuits) for value in range(valueStart, valueEnd + 1))
+        self.size = len(self.pile)
 
     def __str__(self):
-        newString = ""
-
-        for card in self.pile:
-            newString += (str(card) + ',')
-
-        newString = newString[:-1]
-
-        return newString
+        return ','.join(str(card) for card in self.pile)
 
     def __len__(self):
         return self.size
 
-    #adds an item at location where
+    # adds an item at location where, the top and the bottom are O(1), anywhere else is inserted in place
     def addCard(self, card, where):
         if where > -1 and where <= self.size:
-            self.pile = self.pile[:where] + [card] + self.pile[where:]
+            if where == self.size:
+                self.pile.append(card)
+            elif where == 0:
+                self.pile.appendleft(card)
+            else:
+                self.pile.insert(where, card)
             self.size += 1
         else:
             print("I can't add there.")
@@ -66,21 +53,35 @@ class Deck:
     def placeCardBottom(self,card):
         self.addCard(card, 0)
 
-    def shuffle(self,**kwargs):
-
-        newPile = []
-
+    # I have replaced the original shuffle (random pick + del, which is O(n^2)) with a Fisher-Yates shuffle in place.
+    # The top of the deck is the end of the pile, so walking down from the top,
+    # every position is swapped with a random card at or below it.
+    # top=k stops after the k top positions, that is enough when only k cards are drawn afterwards
+    def shuffle(self, **kwargs):
         if "seed" in kwargs:
-            seed(kwargs["seed"])
-
-        while len(self.pile) > 0:
-            item = randint(0, len(self.pile)-1)
-
-            newPile.append(self.pile[item])
-
-            del(self.pile[item])
-
-        self.pile = newPile
+            self.rng.seed(kwargs["seed"])
+
+        last = len(self.pile) - 1
+        stop = max(last - kwargs.get("top", len(self.pile)), 0)
+        # indexing the middle of a deque is not O(1), a long shuffle works on a list copy of the pile
+        full = last - stop > len(self.pile) // 2
+        pile = list(self.pile) if full else self.pile
+        for i in range(last, stop, -1):
+            j = self.rng.randrange(i + 1)
+            pile[i], pile[j] = pile[j], pile[i]
+        if full:
+            self.pile = deque(pile)
+
+    # The order of the pile and the state of the random generator: a small snapshot that puts the deck back
+    # exactly as it is now with set_state (a checkpoint keeps it instead of a copy of the whole deck)
+    def get_state(self):
+        return list(self.pile), self.rng.getstate()
+
+    def set_state(self, state):
+        pile, rng = state
+        self.pile = deque(pile)
+        self.size = len(self.pile)
+        self.rng.setstate(rng)
 
     def is_empty(self):
         return len(self) == 0
@@ -88,12 +89,26 @@ class Deck:
     # Take 5 consecutive cards at the same time from the top to top - 5 and returns a list
     def draw_cards(self, amount=5):
         assert not self.is_empty(), "Cannot draw from an empty deck"
-        cards = self.pile[-amount:]  # take n amount of cards from the top -- WROOONGG !!!!
-        del self.pile[-amount:]  # delete n cards from the top
+        amount = min(amount, self.size)
+        # take n amount of cards from the top, the list keeps their order in the deck (the top card last)
+        cards = [self.pile.pop() for _ in range(amount)]
+        cards.reverse()
         self.size -= amount  # reduce the size number
         return cards
 
-    # put the card list on top of the deck
+    # Deals hand_size cards to each of the players and community cards to the table from one shuffle.
+    # Only the cards that are dealt need to be shuffled (top=...), and they stay in the deck,
+    # so the next deal can follow straight away. Returns (list of the players' hands, community cards)
+    def deal(self, players, hand_size=5, community=0):
+        amount = players * hand_size + community
+        assert 0 < amount <= self.size, "Not enough cards in the deck for this deal"
+        self.shuffle(top=amount)
+        # the top of the deque is read from its end, without walking the rest of the pile
+        cards = [self.pile[i] for i in range(-amount, 0)]
+        hands = [cards[player * hand_size:(player + 1) * hand_size] for player in range(players)]
+        return hands, cards[players * hand_size:]
+
+    # put the card list on top of the deck, all at once
     def place_cards(self, cards):
         assert not len(cards) == 0, "Card list cannot be empty"
         self.pile.extend(cards)  # place cards (list) to the top
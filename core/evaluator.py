@@ -0,0 +1,127 @@
+from core.card import decode_face, decode_suit
+from core.sampler import deck_codes
+from core import hands as classifiers
+from itertools import chain, combinations
+from math import comb
+import numpy as np
+import os
+
+# the lookup table covers every 5 card hand of the standard deck, Deck(1, 13, 4)
+FACES, SUITS, HAND_SIZE = 13, 4, 5
+DECK_SIZE = FACES * SUITS
+COMBINATIONS = comb(DECK_SIZE, HAND_SIZE)  # 2,598,960 hands
+# where the tables (and core.cache's results) are kept, the CARDSIMPLEANALYSIS_CACHE environment variable moves it
+CACHE_DIR = os.environ.get('CARDSIMPLEANALYSIS_CACHE') or \
+    os.path.join(os.path.expanduser('~'), '.cache', 'CardSimpleAnalysis')
+# Bump this whenever a change gives hands other ranks or categories (core.hands or build_tables),
+# the version is part of the file names so the tables of an older version are never loaded
+TABLE_VERSION = 1
+
+# BINOMIAL[n, k] = n choose k, used for the combinatorial index of a hand
+BINOMIAL = np.array([[comb(n, k) for k in range(HAND_SIZE + 1)] for n in range(DECK_SIZE)], dtype=np.int64)
+
+
+class HandEvaluator:
+    '''
+    Precomputed rank of every 5 card hand of the standard 52 card deck.
+    A hand is turned into its position in the combinatorial number system (a perfect hash of the sorted cards),
+    so classifying a batch of hands is one table lookup per hand.
+    The tables are built once and saved as .npy files in cache_dir (CACHE_DIR by default),
+    which later processes memory-map instead of rebuilding.
+    ranks holds the strength of a hand (higher wins, equal ranks tie) and categories its core.hands category.
+    The flush_mask, pair_mask and royal_flush_mask methods can be used in place of the core.hands functions.
+    '''
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or CACHE_DIR
+        self.ranks_path = os.path.join(self.cache_dir, 'hand_ranks-v{0}.npy'.format(TABLE_VERSION))
+        self.categories_path = os.path.join(self.cache_dir, 'hand_categories-v{0}.npy'.format(TABLE_VERSION))
+        if not (os.path.exists(self.ranks_path) and os.path.exists(self.categories_path)):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            ranks, categories = build_tables()
+            _save_atomic(self.ranks_path, ranks)
+            _save_atomic(self.categories_path, categories)
+        self.ranks = np.load(self.ranks_path, mmap_mode='r')
+        self.categories = np.load(self.categories_path, mmap_mode='r')
+
+    # combinatorial index of each hand, an (n, 5) array of card codes from Deck(1, 13, 4)
+    def index(self, hands):
+        hands = np.asarray(hands)
+        cards = np.sort(decode_suit(hands) * FACES + decode_face(hands) - 1, axis=1)
+        return BINOMIAL[cards, np.arange(1, HAND_SIZE + 1)].sum(axis=1)
+
+    def rank(self, hands):
+        return self.ranks[self.index(hands)]
+
+    def category(self, hands):
+        return self.categories[self.index(hands)]
+
+    # True for every hand of a single suit, straight and royal flushes included (same as core.hands.flush_mask)
+    def flush_mask(self, hands):
+        category = self.category(hands)
+        return (category == classifiers.FLUSH) | (category == classifiers.STRAIGHT_FLUSH) | \
+               (category == classifiers.ROYAL_FLUSH)
+
+    # one pair or two pair
+    def pair_mask(self, hands):
+        category = self.category(hands)
+        return (category == classifiers.ONE_PAIR) | (category == classifiers.TWO_PAIR)
+
+    def royal_flush_mask(self, hands, suit=None):
+        mask = self.category(hands) == classifiers.ROYAL_FLUSH
+        if suit is not None:
+            mask &= decode_suit(np.asarray(hands)[:, 0]) == suit
+        return mask
+
+
+# the evaluator is loaded once per process and shared by every experiment
+_evaluator = None
+
+
+# the shared evaluator, with the tables of cache_dir (CACHE_DIR by default)
+def get_evaluator(cache_dir=None):
+    global _evaluator
+    cache_dir = cache_dir or CACHE_DIR
+    if _evaluator is None or _evaluator.cache_dir != cache_dir:
+        _evaluator = HandEvaluator(cache_dir)
+    return _evaluator
+
+
+# Computes the rank and category of every hand, in combinatorial index order.
+# itertools.combinations yields the hands in lexicographic order, their indexes are computed
+# and the results are scattered into place
+def build_tables():
+    positions = np.fromiter(chain.from_iterable(combinations(range(DECK_SIZE), HAND_SIZE)), dtype=np.int64,
+                            count=COMBINATIONS * HAND_SIZE).reshape(COMBINATIONS, HAND_SIZE)
+    hands = deck_codes(1, FACES, SUITS)[positions]
+    categories = classifiers.hand_categories(hands)
+
+    # Tie breaks: the faces ordered by how often they appear and then by value, with the ace above the king.
+    # The category and the 5 ordered faces are packed into one key, 4 bits each
+    faces = decode_face(hands)
+    faces = np.where(faces == classifiers.ACE, classifiers.KING + 1, faces)
+    # in the 5 high straight (A, 2, 3, 4, 5) the ace is the lowest card
+    wheel = classifiers.straight_mask(hands) & (faces == classifiers.KING + 1).any(axis=1) & (faces == 2).any(axis=1)
+    faces[wheel] = np.where(faces[wheel] == classifiers.KING + 1, 1, faces[wheel])
+    counts = (faces[:, :, np.newaxis] == faces[:, np.newaxis, :]).sum(axis=2)
+    order = np.argsort(-(counts * 16 + faces), axis=1, kind='stable')
+    ordered = np.take_along_axis(faces, order, axis=1)
+    keys = categories.astype(np.int64)
+    for column in range(HAND_SIZE):
+        keys = keys * 16 + ordered[:, column]
+    # equal keys are equal hands, np.unique turns the keys into consecutive ranks
+    ranks = np.unique(keys, return_inverse=True)[1].reshape(-1)
+
+    index = BINOMIAL[positions, np.arange(1, HAND_SIZE + 1)].sum(axis=1)
+    rank_table = np.empty(COMBINATIONS, dtype=np.uint16)
+    category_table = np.empty(COMBINATIONS, dtype=np.uint8)
+    rank_table[index] = ranks
+    category_table[index] = categories
+    return rank_table, category_table
+
+
+# writes the table next to its final name first, so another process never maps a half written file
+def _save_atomic(path, table):
+    temp = path + '.' + str(os.getpid()) + '.tmp'
+    with open(temp, 'wb') as file:
+        np.save(file, table)
+    os.replace(temp, path)
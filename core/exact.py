@@ -0,0 +1,101 @@
+from core import hands
+from fractions import Fraction
+from math import comb, factorial, prod
+from collections import Counter
+
+# Exact probabilities of the hands dealt from any deck Deck(valueStart, valueEnd, numSuits) accepts.
+# Every suit holds each face exactly once, so a hand is described by how many cards share each face
+# (its pattern, e.g. (2, 1, 1, 1) for one pair) and everything can be counted with binomial coefficients.
+# The definitions are the ones of core.hands, so these numbers are the ground truth of the simulations.
+
+
+# all the ways to split hand_size cards over faces, biggest group first, no group bigger than the number of suits
+def patterns(hand_size, num_suits, num_faces):
+    def split(left, largest, groups):
+        if left == 0:
+            yield ()
+            return
+        if groups == 0:
+            return
+        for size in range(min(left, largest), 0, -1):
+            for rest in split(left - size, size, groups - 1):
+                yield (size,) + rest
+    return list(split(hand_size, num_suits, num_faces))
+
+
+# number of hands with the given pattern: pick the faces of every group, then the suits of the cards in it
+def pattern_count(pattern, num_faces, num_suits):
+    groups = len(pattern)
+    faces = factorial(num_faces) // factorial(num_faces - groups)
+    # groups of the same size can swap their faces without giving a new hand
+    faces //= prod(factorial(repeat) for repeat in Counter(pattern).values())
+    return faces * prod(comb(num_suits, size) for size in pattern)
+
+
+# the number of different face sets that make a straight, the way core.hands.straight_mask sees them:
+# consecutive faces, or the ace (face 1) played above the king
+def straight_count(valueStart, valueEnd, hand_size=5):
+    num_faces = valueEnd - valueStart + 1
+    count = max(num_faces - hand_size + 1, 0)
+    return count + (1 if _has_ace_high(valueStart, valueEnd, hand_size) else 0)
+
+
+def _has_ace_high(valueStart, valueEnd, hand_size):
+    lowest = hands.KING + 2 - hand_size  # second lowest card of the straight, the ace is the lowest
+    # when that card is a 2 the straight is also consecutive from the ace and already counted
+    return hand_size > 1 and lowest > 2 and valueStart <= hands.ACE and valueEnd >= hands.KING
+
+
+def total_hands(valueStart, valueEnd, numSuits, hand_size=5):
+    return comb((valueEnd - valueStart + 1) * numSuits, hand_size)
+
+
+# the exact number of 5 card hands in every category of core.hands (the key is the category number)
+def category_counts(valueStart, valueEnd, numSuits):
+    num_faces, hand_size = valueEnd - valueStart + 1, 5
+    by_pattern = {pattern: pattern_count(pattern, num_faces, numSuits)
+                  for pattern in patterns(hand_size, numSuits, num_faces)}
+    straights = straight_count(valueStart, valueEnd, hand_size)
+    royals = 1 if _has_ace_high(valueStart, valueEnd, hand_size) else 0
+    # a hand of one suit has 5 different faces
+    flushes = numSuits * comb(num_faces, hand_size)
+    counts = {
+        hands.ROYAL_FLUSH: numSuits * royals,
+        hands.STRAIGHT_FLUSH: numSuits * (straights - royals),
+        hands.FLUSH: flushes - numSuits * straights,
+        hands.STRAIGHT: straights * (numSuits ** hand_size - numSuits),
+        hands.HIGH_CARD: by_pattern.get((1, 1, 1, 1, 1), 0) - flushes - straights * (numSuits ** hand_size - numSuits),
+        hands.ONE_PAIR: by_pattern.get((2, 1, 1, 1), 0),
+        hands.TWO_PAIR: by_pattern.get((2, 2, 1), 0),
+        hands.THREE_OF_A_KIND: by_pattern.get((3, 1, 1), 0),
+        hands.FULL_HOUSE: by_pattern.get((3, 2), 0),
+        hands.FOUR_OF_A_KIND: by_pattern.get((4, 1), 0),
+        hands.FIVE_OF_A_KIND: by_pattern.get((5,), 0),
+    }
+    return counts
+
+
+# exact probability (as a Fraction) of every category of a 5 card hand, keyed by the category name
+def category_probabilities(valueStart, valueEnd, numSuits):
+    total = total_hands(valueStart, valueEnd, numSuits)
+    return {hands.CATEGORY_NAMES[category]: Fraction(count, total)
+            for category, count in sorted(category_counts(valueStart, valueEnd, numSuits).items())}
+
+
+# Exact probabilities of the two hands the experiments count, for any hand size:
+# 'flush' every card of the same suit, 'pair' no more than 2 cards of a face with at least one pair
+# (one pair or two pair in a 5 card hand)
+def hand_probabilities(valueStart, valueEnd, numSuits, hand_size=5):
+    num_faces = valueEnd - valueStart + 1
+    total = total_hands(valueStart, valueEnd, numSuits, hand_size)
+    pairs = sum(pattern_count(pattern, num_faces, numSuits)
+                for pattern in patterns(hand_size, numSuits, num_faces) if pattern[0] == 2)
+    return {'pair': Fraction(pairs, total), 'flush': Fraction(numSuits * comb(num_faces, hand_size), total)}
+
+
+# chance that a hand is a royal flush, only of the given suit when suit is set (hearts are suit 0)
+def royal_flush_probability(valueStart, valueEnd, numSuits, suit=None):
+    royals = category_counts(valueStart, valueEnd, numSuits)[hands.ROYAL_FLUSH]
+    if suit is not None:
+        royals = royals // numSuits
+    return Fraction(royals, total_hands(valueStart, valueEnd, numSuits))
@@ -0,0 +1,122 @@
+from core.card import decode_face, decode_suit
+import numpy as np
+
+# Batch classifiers, every function takes an (n, hand_size) array of card codes (see core.card.encode)
+# and returns one value per hand (row). The masks follow the definitions used by the experiments in main.py,
+# e.g. flush_mask is True for every hand of a single suit, straight flushes included.
+
+# poker hand ranking from the weakest to the strongest hand,
+# five of a kind only exists when a deck has more than 4 suits
+HIGH_CARD = 0
+ONE_PAIR = 1
+TWO_PAIR = 2
+THREE_OF_A_KIND = 3
+STRAIGHT = 4
+FLUSH = 5
+FULL_HOUSE = 6
+FOUR_OF_A_KIND = 7
+STRAIGHT_FLUSH = 8
+ROYAL_FLUSH = 9
+FIVE_OF_A_KIND = 10
+CATEGORY_NAMES = ['high card', 'one pair', 'two pair', 'three of a kind', 'straight', 'flush', 'full house',
+                  'four of a kind', 'straight flush', 'royal flush', 'five of a kind']
+
+# the ace (face 1) can also play above the king
+ACE, KING = 1, 13
+
+
+# how many times every face appears in each hand, a bincount over all the rows at once
+def face_counts(hands):
+    faces = decode_face(np.asarray(hands))
+    width = int(faces.max()) + 1
+    offsets = np.arange(len(faces))[:, np.newaxis] * width
+    return np.bincount((faces + offsets).ravel(), minlength=len(faces) * width).reshape(len(faces), width)
+
+
+# the two biggest face counts of each hand, e.g. (3, 2) for a full house
+def _top_counts(hands):
+    counts = face_counts(hands)
+    if counts.shape[1] < 2:
+        return counts[:, -1], np.zeros(len(counts), dtype=counts.dtype)
+    top = np.partition(counts, counts.shape[1] - 2, axis=1)
+    return top[:, -1], top[:, -2]
+
+
+def flush_mask(hands):
+    suits = decode_suit(np.asarray(hands))
+    return (suits == suits[:, :1]).all(axis=1)
+
+
+# all faces are different and follow each other, the ace counts either as the lowest or above the king
+def straight_mask(hands):
+    faces = np.sort(decode_face(np.asarray(hands)), axis=1)
+    distinct = (faces[:, 1:] != faces[:, :-1]).all(axis=1)
+    low = faces[:, -1] - faces[:, 0] == faces.shape[1] - 1
+    # with the ace moved above the king the hand starts at its second card
+    high = (faces[:, 0] == ACE) & (faces[:, -1] == KING) & (KING + 1 - faces[:, 1] == faces.shape[1] - 1)
+    return distinct & (low | high)
+
+
+def straight_flush_mask(hands):
+    return straight_mask(hands) & flush_mask(hands)
+
+
+# ace high straight flush, the suit can be restricted (the royal flush experiment only counts hearts, suit 0)
+def royal_flush_mask(hands, suit=None):
+    hands = np.asarray(hands)
+    faces = decode_face(hands)
+    mask = straight_flush_mask(hands) & (faces == ACE).any(axis=1) & (faces == KING).any(axis=1)
+    if suit is not None:
+        mask &= decode_suit(hands[:, 0]) == suit
+    return mask
+
+
+# one pair or two pair, the same hands main.is_pair accepts
+def pair_mask(hands):
+    first = _top_counts(hands)[0]
+    return first == 2
+
+
+def one_pair_mask(hands):
+    first, second = _top_counts(hands)
+    return (first == 2) & (second < 2)
+
+
+def two_pair_mask(hands):
+    first, second = _top_counts(hands)
+    return (first == 2) & (second == 2)
+
+
+def three_of_a_kind_mask(hands):
+    first, second = _top_counts(hands)
+    return (first == 3) & (second < 2)
+
+
+def full_house_mask(hands):
+    first, second = _top_counts(hands)
+    return (first == 3) & (second >= 2)
+
+
+def four_of_a_kind_mask(hands):
+    first = _top_counts(hands)[0]
+    return first == 4
+
+
+def five_of_a_kind_mask(hands):
+    first = _top_counts(hands)[0]
+    return first >= 5
+
+
+# returns the category (HIGH_CARD ... FIVE_OF_A_KIND) of the best hand each row makes
+def hand_categories(hands):
+    hands = np.asarray(hands)
+    first, second = _top_counts(hands)
+    flush = flush_mask(hands)
+    straight = straight_mask(hands)
+    royal = royal_flush_mask(hands)
+    # np.select takes the first condition that holds, so they are listed from the strongest hand down
+    conditions = [first >= 5, royal, straight & flush, first == 4, (first == 3) & (second >= 2), flush, straight,
+                  first == 3, (first == 2) & (second == 2), first == 2]
+    choices = [FIVE_OF_A_KIND, ROYAL_FLUSH, STRAIGHT_FLUSH, FOUR_OF_A_KIND, FULL_HOUSE, FLUSH, STRAIGHT,
+               THREE_OF_A_KIND, TWO_PAIR, ONE_PAIR]
+    return np.select(conditions, choices, default=HIGH_CARD)
@@ -0,0 +1,67 @@
+import itertools
+import json
+import os
+
+
+def _read_spec(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.json':
+        with open(path) as file:
+            return json.load(file)
+    if extension == '.toml':
+        import tomllib
+        with open(path, 'rb') as file:
+            return tomllib.load(file)
+    if extension in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError('YAML job files need PyYAML (pip install pyyaml), JSON and TOML work without it')
+        with open(path) as file:
+            return yaml.safe_load(file)
+    raise ValueError('Unknown job file format ' + extension + ', use .json, .toml or .yaml')
+
+
+# every combination of the values in sweep, e.g. {'suit': [1, 2], 'seed': [7, 8]} gives 4 settings
+def _expand(sweep):
+    keys = list(sweep)
+    return [dict(zip(keys, values)) for values in itertools.product(*(sweep[key] for key in keys))]
+
+
+def load_jobs(path, options=None):
+    '''
+    Reads a job file (JSON, TOML or YAML) that lists many experiment configurations, for example in JSON:
+
+        {"defaults": {"engine": "batch", "workers": 4, "attempts": 1000},
+         "jobs": [{"experiment": "chances_of_hands", "suit": 6, "experiments": 100, "seed": 1},
+                  {"experiment": "royal_flush_chance", "suit": 4, "experiments": 5},
+                  {"experiment": "changes_in_chance", "trials": 10, "sweep": {"seed": [1, 2, 3]}}]}
+
+    Every job names the experiment (a function of main.py) and its keyword arguments, e.g. the deck shape
+    (faces as [valueStart, valueEnd] and suit), attempts, experiments, seed, engine and workers.
+    defaults are filled into every job, and a job with a sweep becomes one job per combination of its values.
+    options maps the name of every experiment to the keyword arguments it takes (main.JOB_OPTIONS):
+    a default only goes into the jobs of the experiments that take it (above, royal_flush_chance deals
+    until it finds a royal flush and gets no attempts), and a job that sets anything else is refused.
+    A file that is just a list is read as the list of jobs.
+    Returns the list of jobs as dictionaries, in the order of the file.
+    '''
+    spec = _read_spec(path)
+    if isinstance(spec, list):
+        spec = {'jobs': spec}
+    defaults = spec.get('defaults', {})
+    jobs = []
+    for job in spec.get('jobs', []):
+        taken = (options or {}).get(job.get('experiment'))
+        job = dict({key: value for key, value in defaults.items() if taken is None or key in taken}, **job)
+        sweep = job.pop('sweep', {})
+        for setting in _expand(sweep):
+            job = dict(job, **setting)
+            if 'experiment' not in job:
+                raise ValueError('Job without an experiment in ' + path + ': ' + str(job))
+            unknown = sorted(set(job) - {'experiment'} - set(taken)) if taken is not None else []
+            if unknown:
+                raise ValueError('{0} does not take {1} (job in {2}: {3})'.format(job['experiment'], ', '.join(unknown),
+                                                                                path, job))
+            jobs.append(job)
+    return jobs
@@ -0,0 +1,80 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# How the experiments create their charts:
+# 'inline' renders every chart on the spot, 'deferred' hands it to a background process once the experiment
+# has finished computing, so the next experiment can start straight away, and 'off' does not create any.
+# matplotlib is only imported when a chart is actually rendered, a run without charts never loads it
+PLOT_MODES = ('off', 'deferred', 'inline')
+
+# the background processes that render the deferred charts, started with the first one
+_pool = None
+_pending = []
+_failed = 0
+
+
+# The charts are drawn on a plain Figure instead of pyplot, it is not kept in any global list of figures
+# and nothing needs to be closed, the figure is gone as soon as it has been saved
+def _figure():
+    from matplotlib.figure import Figure
+    figure = Figure()
+    return figure, figure.subplots()
+
+
+def barchart(values, desc, path):
+    figure, axes = _figure()
+    interval = 5 if len(values) > 50 else 1  # this is the interval code, this will trick the xticks just to print which numbers needed
+    x = np.arange(len(values))  # create np array for x label, for the interval x-axis label
+    ticks = np.arange(1, len(values) + 1)  # this is the actual value of each bar
+    axes.bar(range(len(values)), values, align='center')
+    axes.set_xticks(x[::interval], ticks[::interval])
+    axes.set_xlabel(desc['xlabel'])
+    axes.set_ylabel(desc['ylabel'])
+    axes.set_title(desc['title'])
+    figure.tight_layout()
+    figure.savefig(path)
+
+
+def scatterplot(x, y, desc, path):
+    figure, axes = _figure()
+    axes.scatter(x, y, s=3, c='red', alpha=0.75)  # size 3 using red color not too big using 0.75 alpha transparency
+    axes.set_xlabel(desc['xlabel'])
+    axes.set_ylabel(desc['ylabel'])
+    axes.set_title(desc['title'])
+    figure.savefig(path)
+
+
+def _report(future):
+    if not future.cancelled() and future.exception() is not None:
+        print(future.exception())
+
+
+# renders a chart, function is barchart or scatterplot and args its arguments, the way mode says
+def render(function, args, mode='inline'):
+    global _pool, _failed
+    assert mode in PLOT_MODES, 'Unknown plot mode ' + str(mode)
+    if mode == 'inline':
+        function(*args)
+    elif mode == 'deferred':
+        if _pool is None:
+            # one process is enough, charts are quick and the experiments need the cores
+            _pool = ProcessPoolExecutor(1)
+        # the charts that are done are forgotten, only the number of failures is kept
+        _failed += sum(1 for future in _pending if future.done() and future.exception() is not None)
+        _pending[:] = [future for future in _pending if not future.done()]
+        future = _pool.submit(function, *args)
+        future.add_done_callback(_report)
+        _pending.append(future)
+
+
+# Waits until every deferred chart has been saved, returns how many of them failed.
+# Python also waits for them on exit, this is for callers that need the files now
+def wait_for_plots():
+    global _pool, _failed
+    failed = _failed + sum(1 for future in _pending if future.exception() is not None)
+    _pending.clear()
+    _failed = 0
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+    return failed
@@ -0,0 +1,112 @@
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+
+# the parts an experiment run is broken down into
+PHASES = ('shuffle', 'deal', 'classify', 'aggregate', 'plot')
+
+
+class PhaseTimer:
+    '''
+    Adds up the time (perf_counter) an experiment spends in every phase, e.g.
+        with timer.phase('classify'):
+            ...
+    Timers of different experiments or worker processes merge into one breakdown.
+    '''
+    def __init__(self):
+        self.seconds = {}
+        self.calls = {}
+
+    def __bool__(self):
+        return True
+
+    @contextmanager
+    def phase(self, name):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, perf_counter() - start)
+
+    def add(self, name, seconds, calls=1):
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + calls
+
+    def merge(self, other):
+        for name, seconds in other.seconds.items():
+            self.add(name, seconds, other.calls[name])
+        return self
+
+    # a result of profiled_trial: the phases of the trial are added here and its own result is returned
+    def collect(self, result):
+        result, timer = result
+        self.merge(timer)
+        return result
+
+    def total(self):
+        return sum(self.seconds.values())
+
+    # one line per phase, the known phases first, with the share of the total time
+    def report(self):
+        total = self.total() or 1.0
+        names = [name for name in PHASES if name in self.seconds] + sorted(set(self.seconds) - set(PHASES))
+        return ['{0:<10} {1:10.4f} s {2:6.1%} in {3} calls'.format(name, self.seconds[name], self.seconds[name] / total,
+                                                                   self.calls[name]) for name in names]
+
+
+class NullTimer:
+    '''The timer of a run that is not profiled, every phase is a shared no-op context.'''
+    _context = nullcontext()
+
+    def __bool__(self):
+        return False
+
+    def phase(self, name):
+        return self._context
+
+    def add(self, name, seconds, calls=1):
+        pass
+
+    def merge(self, other):
+        return self
+
+    def collect(self, result):
+        return result
+
+    def total(self):
+        return 0.0
+
+    def report(self):
+        return []
+
+
+NULL_TIMER = NullTimer()
+# the timer the trials of core.trials report to, only set while profiled_trial runs one
+_current = NULL_TIMER
+
+
+def current_timer():
+    return _current
+
+
+# Runs task(*args) with a fresh timer and returns (result, timer). It is a module level function,
+# so core.runner can run it in a worker process and the timings still come back with the result
+def profiled_trial(task, *args):
+    global _current
+    timer, previous = PhaseTimer(), _current
+    _current = timer
+    try:
+        return task(*args), timer
+    finally:
+        _current = previous
+
+
+# the task and arguments to hand to core.runner, wrapped in profiled_trial when timer is a real timer
+def profiled(task, args, timer):
+    return (profiled_trial, (task,) + tuple(args)) if timer else (task, args)
+
+
+# the timer of an experiment from its profile argument: a PhaseTimer to fill, True for a new one, or nothing
+def create_timer(profile):
+    if isinstance(profile, PhaseTimer):
+        return profile
+    return PhaseTimer() if profile else NULL_TIMER
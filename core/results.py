@@ -0,0 +1,244 @@
+import atexit
+import datetime
+import glob
+import math
+import os
+import uuid
+import numpy as np
+
+# The results store keeps every finished experiment run in three tables of a directory:
+#   runs       one row per run: what was run on which deck, its seed, engine and how long it took
+#   summaries  one row per run and measured value: count, mean, std, min, max and 95% half width
+#   trials     one row per run, measured value and trial: the raw number of every trial (experiment)
+# Every table is a set of part files, Parquet when pyarrow is installed and .npz (numpy only) otherwise.
+# A part file is never changed once written, more runs just add more parts, so any number of
+# processes can write into the same directory and nothing is ever overwritten.
+RUN_COLUMNS = {'run': str, 'experiment': str, 'engine': str, 'faces_start': np.int64, 'faces_end': np.int64,
+               'suits': np.int64, 'seed': str, 'workers': np.int64, 'attempts': np.int64, 'experiments': np.int64,
+               'started': np.float64, 'seconds': np.float64}
+SUMMARY_COLUMNS = {'run': str, 'metric': str, 'count': np.int64, 'mean': np.float64, 'std': np.float64,
+                   'min': np.float64, 'max': np.float64, 'half_width': np.float64}
+TRIAL_COLUMNS = {'run': str, 'metric': str, 'trial': np.int64, 'value': np.float64}
+TABLES = {'runs': RUN_COLUMNS, 'summaries': SUMMARY_COLUMNS, 'trials': TRIAL_COLUMNS}
+# what a column holds when a run does not have the value, e.g. the seed of an unseeded run
+MISSING = {str: '', np.int64: -1, np.float64: math.nan}
+
+# the buffered rows are written out once there are this many trial rows
+BUFFER_ROWS = 1 << 16
+# a TrialStream hands its trials to the sink once it holds this many of every value
+CHUNK_TRIALS = 4096
+
+
+# pyarrow is optional, it is only imported when a store is written or read
+def _parquet():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+
+# a seed as text, a SeedSequence is written as its entropy and spawn key, e.g. 1234/0/3
+def describe_seed(seed):
+    if seed is None:
+        return ''
+    if isinstance(seed, np.random.SeedSequence):
+        return '/'.join(str(part) for part in (seed.entropy,) + tuple(seed.spawn_key))
+    return str(seed)
+
+
+class ResultSink:
+    '''
+    Buffers finished runs in memory, column by column, and writes them to the store in directory
+    as new part files once BUFFER_ROWS trial rows have piled up, on flush() and on close().
+    file_format is 'parquet' or 'npz', by default Parquet when pyarrow is installed.
+    '''
+    def __init__(self, directory, buffer_rows=BUFFER_ROWS, file_format=None):
+        self.directory = directory
+        self.buffer_rows = buffer_rows
+        self.file_format = file_format or ('parquet' if _parquet() is not None else 'npz')
+        assert self.file_format in ('parquet', 'npz'), 'Unknown results format ' + str(self.file_format)
+        # part files of this sink start with the time it was opened and the process id
+        self.prefix = datetime.datetime.now().strftime("%Y_%m_%d_%H_%M_%S_%f") + '-' + str(os.getpid())
+        self.parts = 0
+        self.buffers = {table: {name: [] for name in columns} for table, columns in TABLES.items()}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _append(self, table, row):
+        columns = TABLES[table]
+        for name, values in self.buffers[table].items():
+            value = row.get(name)
+            values.append(MISSING[columns[name]] if value is None else value)
+
+    # Adds a finished run. metadata has the run settings (engine, faces as (valueStart, valueEnd), suits, seed,
+    # workers, attempts, started and seconds), trials the raw numbers of every measured value by its name
+    # and stats the RunningStats of those values, when the experiment has them.
+    # A run whose trials were streamed (see TrialStream) passes its id and sends no trials here.
+    # Returns the id of the run
+    def record(self, experiment, metadata, trials, stats=None, run=None):
+        run = run or uuid.uuid4().hex
+        faces = metadata.get('faces') or (None, None)
+        experiments = max((len(values) for values in trials.values()), default=0)
+        row = dict(metadata, run=run, experiment=experiment, faces_start=faces[0], faces_end=faces[1],
+                   seed=describe_seed(metadata.get('seed')), experiments=metadata.get('experiments', experiments))
+        self._append('runs', row)
+        for metric, summary in (stats or {}).items():
+            self._append('summaries', {'run': run, 'metric': metric, 'count': summary.count, 'mean': summary.mean,
+                                       'std': summary.std(ddof=1), 'min': summary.min, 'max': summary.max,
+                                       'half_width': summary.half_width()})
+        for metric, values in trials.items():
+            self.add_trials(run, metric, values)
+        return run
+
+    # adds raw trials of a run, numbered from first on
+    def add_trials(self, run, metric, values, first=1):
+        buffer = self.buffers['trials']
+        values = np.asarray(values, dtype=np.float64).ravel()
+        buffer['run'].extend([run] * len(values))
+        buffer['metric'].extend([metric] * len(values))
+        buffer['trial'].extend(range(first, first + len(values)))
+        buffer['value'].extend(values.tolist())
+        if len(buffer['run']) >= self.buffer_rows:
+            self.flush()
+
+    # writes everything buffered so far as one new part file of every table that has rows buffered
+    def flush(self):
+        tables = [table for table in TABLES if self.buffers[table]['run']]
+        if not tables:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        for table in tables:
+            columns = TABLES[table]
+            arrays = {name: np.asarray(self.buffers[table][name], dtype=columns[name]) for name in columns}
+            path = os.path.join(self.directory, '{0}-{1}-{2:05d}'.format(table, self.prefix, self.parts))
+            _write_part(path, arrays, self.file_format)
+            for values in self.buffers[table].values():
+                values.clear()
+        self.parts += 1
+
+    def close(self):
+        self.flush()
+
+
+class TrialStream:
+    '''
+    Sends the raw trials of one run to a sink while the run is still going, in chunks of CHUNK_TRIALS,
+    so a run of any length only keeps one chunk of them in memory, e.g.
+        trials = TrialStream(sink, ('pair', 'flush'))
+        trials.add(pair=0.42, flush=0.002)      # once for every experiment
+        trials.finish('chances_of_hands', metadata, stats)
+    A run resumed from a checkpoint continues the same run: it gets the run id and the number of trials
+    that were written out with the checkpoint (see sync).
+    '''
+    def __init__(self, sink, metrics, run=None, sent=0, chunk=CHUNK_TRIALS):
+        self.sink = sink
+        self.run = run or uuid.uuid4().hex
+        self.sent = sent
+        self.chunk = chunk
+        self.values = {metric: [] for metric in metrics}
+        self.pending = 0
+
+    # adds one trial, a value for every metric
+    def add(self, **values):
+        for metric, value in values.items():
+            self.values[metric].append(value)
+        self.pending += 1
+        if self.pending >= self.chunk:
+            self.flush()
+
+    # hands every trial added so far to the sink
+    def flush(self):
+        for metric, values in self.values.items():
+            self.sink.add_trials(self.run, metric, values, first=self.sent + 1)
+            values.clear()
+        self.sent += self.pending
+        self.pending = 0
+
+    # writes every trial added so far into the store, the number of trials sent is then all there is on disk
+    def sync(self):
+        self.flush()
+        self.sink.flush()
+
+    # flushes the trials and adds the run itself, returns its id
+    def finish(self, experiment, metadata, stats=None):
+        self.flush()
+        return self.sink.record(experiment, dict({'experiments': self.sent}, **metadata), {}, stats, run=self.run)
+
+
+def _write_part(path, arrays, file_format):
+    # written under a temporary name and renamed, a reader never sees half a part
+    temp = path + '.tmp'
+    if file_format == 'parquet':
+        pyarrow = _parquet()
+        pyarrow.parquet.write_table(pyarrow.table(arrays), temp)
+        os.replace(temp, path + '.parquet')
+    else:
+        with open(temp, 'wb') as file:
+            np.savez(file, **arrays)
+        os.replace(temp, path + '.npz')
+
+
+def _read_part(path):
+    if path.endswith('.parquet'):
+        pyarrow = _parquet()
+        if pyarrow is None:
+            raise ImportError('Reading ' + path + ' needs pyarrow (pip install pyarrow)')
+        table = pyarrow.parquet.read_table(path)
+        return {name: table.column(name).to_numpy() for name in table.column_names}
+    with np.load(path) as part:
+        return {name: part[name] for name in part.files}
+
+
+# one sink for every directory in this process, so the runs of a whole job file share their buffers
+_sinks = {}
+
+
+def get_sink(directory):
+    if directory not in _sinks:
+        if not _sinks:
+            atexit.register(close_sinks)
+        _sinks[directory] = ResultSink(directory)
+    return _sinks[directory]
+
+
+def close_sinks():
+    for sink in _sinks.values():
+        sink.close()
+
+
+def load_results(directory, table='runs', **where):
+    '''
+    Loads a table of the results store in directory as a dictionary of numpy arrays, one per column.
+    Only the rows that match every keyword are kept, e.g.
+        runs = load_results('results', experiment='chances_of_hands', suits=4)
+        trials = load_results('results', 'trials', run=runs['run'][0], metric='pair')
+    Whatever this process still has buffered for the directory is written first.
+    '''
+    assert table in TABLES, 'Unknown results table ' + str(table)
+    if directory in _sinks:
+        _sinks[directory].flush()
+    columns = TABLES[table]
+    paths = sorted(glob.glob(os.path.join(directory, table + '-*.npz')) +
+                   glob.glob(os.path.join(directory, table + '-*.parquet')))
+    parts = [_read_part(path) for path in paths]
+    result = {name: np.concatenate([part[name] for part in parts]).astype(columns[name]) if parts
+              else np.array([], dtype=columns[name]) for name in columns}
+    if where:
+        keep = np.ones(len(result['run']), dtype=bool)
+        for name, value in where.items():
+            keep &= result[name] == value
+        result = {name: values[keep] for name, values in result.items()}
+    if table == 'trials' and len(result['run']):
+        # a run that was killed and resumed from its checkpoint sends the trials after the checkpoint again,
+        # they are the very same numbers, so only the first of them is kept
+        keys = np.rec.fromarrays([result['run'], result['metric'], result['trial']])
+        first = np.sort(np.unique(keys, return_index=True)[1])
+        if len(first) < len(keys):
+            result = {name: values[first] for name, values in result.items()}
+    return result
@@ -0,0 +1,111 @@
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+import itertools
+import math
+import numpy as np
+import os
+
+
+def _root_seed(seed):
+    return seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+
+
+# every experiment gets its own child of the root seed, so its random numbers do not depend on
+# which worker runs it or how many workers there are
+def spawn_seeds(seed, amount):
+    return _root_seed(seed).spawn(amount)
+
+
+# the index-th child of a fresh root seed, the same SeedSequence spawn_seeds would give,
+# without creating all the children before it
+def child_seed(root, index):
+    return np.random.SeedSequence(root.entropy, spawn_key=root.spawn_key + (index,), pool_size=root.pool_size)
+
+
+# runs a shard of experiments (from begin to end) inside a worker process
+def _run_shard(task, args, root, begin, end):
+    return [task(*args, child_seed(root, index)) for index in range(begin, end)]
+
+
+class ExperimentRunner:
+    '''
+    Runs independent experiments across several processes.
+    A task is a module level function called as task(*args, seed) for every experiment,
+    where seed is the numpy SeedSequence of that experiment.
+    The experiments are cut into contiguous shards and the results come back in experiment order,
+    so a run gives the same results with any number of workers.
+    With one worker everything runs in the current process without a pool.
+    '''
+    # a few shards per worker keeps them all busy when some shards are slower
+    SHARDS_PER_WORKER = 4
+    # shards are never bigger than this, so results stream back even for very long runs
+    MAX_SHARD = 1000
+    # shard size when the number of experiments is not known in advance
+    UNBOUNDED_SHARD = 8
+
+    def __init__(self, workers=1):
+        self.workers = os.cpu_count() if workers is None else max(1, workers)
+        self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    # Yields the result of every experiment in order, while the next shards are still running.
+    # With experiments=None it keeps going until the caller stops iterating.
+    # start skips the experiments that are already done, e.g. when a run is resumed from a checkpoint
+    def imap(self, task, args, experiments, seed=None, start=0):
+        root = _root_seed(seed)
+        total = math.inf if experiments is None else experiments
+        if self.workers == 1 or total - start < 2:
+            index = start
+            while index < total:
+                yield task(*args, child_seed(root, index))
+                index += 1
+            return
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(self.workers)
+        if experiments is None:
+            size = self.UNBOUNDED_SHARD
+        else:
+            size = min(-(-(experiments - start) // (self.workers * self.SHARDS_PER_WORKER)), self.MAX_SHARD)  # ceiling division
+        starts = itertools.takewhile(lambda begin: begin < total, itertools.count(start, size))
+        shards = ((begin, min(begin + size, total)) for begin in starts)
+        # only a limited number of shards is in flight, so memory does not grow with the number of experiments
+        pending = deque()
+        try:
+            for begin, end in itertools.islice(shards, self.workers * self.SHARDS_PER_WORKER):
+                pending.append(self.pool.submit(_run_shard, task, args, root, begin, end))
+            while pending:
+                results = pending.popleft().result()
+                for begin, end in itertools.islice(shards, 1):
+                    pending.append(self.pool.submit(_run_shard, task, args, root, begin, end))
+                yield from results
+        finally:
+            # the caller stopped early, the shards nobody is waiting for anymore are dropped
+            for future in pending:
+                future.cancel()
+
+    def map(self, task, args, experiments, seed=None, start=0):
+        return list(self.imap(task, args, experiments, seed, start))
+
+
+# runs the same task for a number of experiments, on the given runner or on a temporary one,
+# and yields the results one experiment at a time
+def iter_experiments(task, args, experiments, seed=None, workers=1, runner=None, start=0):
+    if runner is not None:
+        yield from runner.imap(task, args, experiments, seed, start)
+        return
+    with ExperimentRunner(workers) as runner:
+        yield from runner.imap(task, args, experiments, seed, start)
+
+
+def run_experiments(task, args, experiments, seed=None, workers=1, runner=None, start=0):
+    return list(iter_experiments(task, args, experiments, seed, workers, runner, start))
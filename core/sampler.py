@@ -0,0 +1,60 @@
+from core.card import encode, check_card
+import numpy as np
+
+# hands up to this size are drawn card by card, bigger ones use random sort keys
+SMALL_HAND = 8
+# upper bound for the number of random keys generated at once (rows * deck size),
+# bigger requests are split into chunks of rows so memory stays around 32MB
+MAX_KEYS = 1 << 22
+
+
+# returns all the cards of a deck as integer codes, in the same order Deck builds its pile
+def deck_codes(valueStart, valueEnd, numSuits):
+    if valueStart <= valueEnd and numSuits > 0:
+        check_card(valueStart, 0)
+        check_card(valueEnd, numSuits - 1)
+    faces = np.arange(valueStart, valueEnd + 1, dtype=np.int64)
+    suits = np.arange(numSuits, dtype=np.int64)
+    return encode(faces[np.newaxis, :], suits[:, np.newaxis]).ravel()
+
+
+# Deals n independent hands in one go and returns an (n, hand_size) array of card codes.
+# Every row is the top of a freshly shuffled deck, so cards never repeat inside a hand.
+def sample_hands(codes, n, hand_size=5, rng=None):
+    codes = np.asarray(codes)
+    size = len(codes)
+    assert 0 < hand_size <= size, "Hand size must be between 1 and the number of cards in the deck"
+    rng = np.random.default_rng() if rng is None else rng
+    if hand_size <= SMALL_HAND:
+        return codes[_draw_positions(size, n, hand_size, rng)]
+    # bigger hands: every row gets a random key per card and the hand_size smallest keys are picked,
+    # which is the same as taking the first cards of a random permutation
+    hands = np.empty((n, hand_size), dtype=codes.dtype)
+    rows = max(1, MAX_KEYS // size)
+    for begin in range(0, n, rows):
+        end = min(begin + rows, n)
+        keys = rng.random((end - begin, size))
+        if hand_size < size:
+            index = np.argpartition(keys, hand_size - 1, axis=1)[:, :hand_size]
+            # argpartition leaves the picked cards in no particular order, sorted by their keys
+            # they are in random order again, which matters once a row is split between players
+            order = np.argsort(np.take_along_axis(keys, index, axis=1), axis=1)
+            index = np.take_along_axis(index, order, axis=1)
+        else:
+            index = np.argsort(keys, axis=1)
+        hands[begin:end] = codes[index]
+    return hands
+
+
+# Draws hand_size distinct positions per row, one column at a time.
+# The j-th card is picked uniformly among the size - j cards that are left: a random rank is drawn
+# and then moved past every position that was already taken (walking them in ascending order)
+def _draw_positions(size, n, hand_size, rng):
+    positions = np.empty((n, hand_size), dtype=np.int64)
+    for j in range(hand_size):
+        rank = rng.integers(0, size - j, size=n)
+        taken = np.sort(positions[:, :j], axis=1)
+        for column in range(j):
+            rank += rank >= taken[:, column]
+        positions[:, j] = rank
+    return positions
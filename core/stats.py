@@ -0,0 +1,116 @@
+from statistics import NormalDist
+import math
+import time
+import numpy as np
+
+
+class RunningStats:
+    '''
+    Streaming summary of a series of numbers: count, mean, variance (Welford's algorithm), minimum and maximum.
+    Values are added one at a time or in numpy batches and nothing is kept besides the summary,
+    so memory stays the same however long an experiment runs and the statistics can be read at any point.
+    Two summaries (e.g. from two workers) merge into the summary of both series.
+    '''
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared distances from the mean
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __len__(self):
+        return self.count
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        return self
+
+    # adds a whole batch, it is summarised with numpy first and then merged in
+    def add_all(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if len(values) == 0:
+            return self
+        batch = RunningStats()
+        batch.count = len(values)
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min, batch.max = float(values.min()), float(values.max())
+        return self.merge(batch)
+
+    # the parallel version of Welford's algorithm (Chan et al.)
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    # ddof=0 is the population variance (numpy's default), ddof=1 the sample variance
+    def variance(self, ddof=0):
+        if self.count - ddof <= 0:
+            return math.nan
+        return self.m2 / (self.count - ddof)
+
+    def std(self, ddof=0):
+        return math.sqrt(self.variance(ddof))
+
+    # half the width of the normal approximation confidence interval of the mean
+    def half_width(self, level=0.95):
+        if self.count < 2:
+            return math.inf
+        z = NormalDist().inv_cdf((1 + level) / 2)
+        return z * self.std(ddof=1) / math.sqrt(self.count)
+
+    def confidence_interval(self, level=0.95):
+        half = self.half_width(level)
+        return self.mean - half, self.mean + half
+
+    def summary(self):
+        return {'count': self.count, 'mean': self.mean, 'variance': self.variance(), 'std': self.std(ddof=1),
+                'min': self.min, 'max': self.max}
+
+
+# Half width of the Agresti-Coull confidence interval of a proportion, hits out of trials.
+# Unlike the plain normal interval it does not shrink to zero while no hit has been seen yet,
+# which matters for rare hands like a flush in a deck with many suits
+def proportion_half_width(hits, trials, level=0.95):
+    z = NormalDist().inv_cdf((1 + level) / 2)
+    adjusted = trials + z * z
+    p = (hits + z * z / 2) / adjusted
+    return z * math.sqrt(p * (1 - p) / adjusted)
+
+
+class StoppingRule:
+    '''
+    Decides when an experiment that runs until a target precision has seen enough samples.
+    It stops once every confidence interval half width handed to done() is at most ci_halfwidth,
+    or when max_samples samples have been used, or after time_budget seconds, whichever comes first.
+    The reason it stopped is kept in reason.
+    '''
+    def __init__(self, ci_halfwidth=None, max_samples=None, time_budget=None, min_experiments=10):
+        self.ci_halfwidth = ci_halfwidth
+        self.max_samples = max_samples
+        self.time_budget = time_budget
+        self.min_experiments = min_experiments
+        self.started = time.time()
+        self.reason = None
+
+    def done(self, experiments, samples, half_widths):
+        if self.ci_halfwidth is not None and experiments >= self.min_experiments and \
+                all(half <= self.ci_halfwidth for half in half_widths):
+            self.reason = 'target precision reached'
+        elif self.max_samples is not None and samples >= self.max_samples:
+            self.reason = 'sample budget used'
+        elif self.time_budget is not None and time.time() - self.started >= self.time_budget:
+            self.reason = 'time budget used'
+        return self.reason is not None
@@ -0,0 +1,79 @@
+from core.card import decode_face, decode_suit
+from core.sampler import deck_codes, sample_hands
+from core.evaluator import get_evaluator, FACES, SUITS as STANDARD_SUITS
+from core.exact import royal_flush_probability
+from core.profiling import current_timer
+from core import hands
+import numpy as np
+import time
+
+# One experiment of every simulation in main.py, written as plain module level functions
+# so core.runner can send them to other processes. The last argument is always the seed of the experiment.
+# Their phases are timed when they run under core.profiling.profiled_trial, dealing includes the shuffle here.
+
+# how many candidate hands are dealt at once while looking for a royal flush
+ROYAL_FLUSH_BATCH = 1 << 21
+# the face range (valueStart, valueEnd) of the standard deck, the decks of the experiments can have any other
+STANDARD_FACES = (1, FACES)
+
+
+# Hands dealt from the standard 52 card deck are classified with the lookup table of core.evaluator,
+# any other deck with the vectorized classifiers of core.hands. Both offer the same *_mask functions
+def get_classifier(suit, faces=STANDARD_FACES):
+    return get_evaluator() if suit == STANDARD_SUITS and tuple(faces) == STANDARD_FACES else hands
+
+
+# mean face of single cards drawn from a full Deck(*faces, suit), the card goes back every time
+def fairness_trial(faces, suit, attempts, seed):
+    timer = current_timer()
+    rng = np.random.default_rng(seed)
+    with timer.phase('deal'):
+        drawn = decode_face(sample_hands(deck_codes(*faces, suit), attempts, hand_size=1, rng=rng))
+    with timer.phase('aggregate'):
+        return int(drawn.sum()) / attempts
+
+
+# share of pair and flush hands among 5 card hands dealt from Deck(*faces, suit)
+def hands_trial(faces, suit, attempts, seed):
+    timer = current_timer()
+    rng = np.random.default_rng(seed)
+    with timer.phase('deal'):
+        dealt = sample_hands(deck_codes(*faces, suit), attempts, rng=rng)
+    with timer.phase('classify'):
+        classifier = get_classifier(suit, faces)
+        flush = classifier.flush_mask(dealt)
+        # a flush cannot be a pair
+        pair = classifier.pair_mask(dealt) & ~flush
+    with timer.phase('aggregate'):
+        return int(pair.sum()) / attempts, int(flush.sum()) / attempts
+
+
+# Deals batches of hands until a royal flush of hearts shows up (rejection sampling).
+# Returns the number of hands it took and how long the search lasted
+def royal_flush_trial(suit, batch, seed):
+    start = time.time()
+    timer = current_timer()
+    rng = np.random.default_rng(seed)
+    codes = deck_codes(1, 13, suit)
+    classifier = get_classifier(suit)
+    attempts = 0
+    while True:
+        with timer.phase('deal'):
+            dealt = sample_hands(codes, batch, rng=rng)
+        with timer.phase('classify'):
+            # only the hands made of hearts alone can be a royal flush of hearts, the rest is dropped first
+            hearts = np.flatnonzero((decode_suit(dealt) == 0).all(axis=1))
+            found = hearts[classifier.royal_flush_mask(dealt[hearts], suit=0)]
+        if len(found) > 0:
+            return attempts + int(found[0]) + 1, time.time() - start
+        attempts += batch
+
+
+# Same search as royal_flush_trial without dealing a single hand:
+# every hand is a royal flush of hearts with the same exact probability p, so the number of hands
+# until the first one follows a geometric distribution with parameter p and can be drawn directly
+def royal_flush_geometric_trial(suit, seed):
+    start = time.time()
+    rng = np.random.default_rng(seed)
+    attempts = int(rng.geometric(float(royal_flush_probability(1, 13, suit, suit=0))))
+    return attempts, time.time() - start
@@ -1,17 +1,70 @@
 from core.deck import Deck
-from matplotlib import pyplot
+from core.array_deck import ArrayDeck
+from core.card import FACE_MASK, SUIT_SHIFT
+from core.trials import fairness_trial, hands_trial, royal_flush_trial, royal_flush_geometric_trial, get_classifier
+from core.trials import ROYAL_FLUSH_BATCH, STANDARD_FACES
+from core.runner import ExperimentRunner, iter_experiments, spawn_seeds
+from core.stats import RunningStats, StoppingRule, proportion_half_width
+from core.exact import hand_probabilities
+from core.checkpoint import Checkpoint, read_checkpoint, fresh_seed
+from core.jobs import load_jobs
+from core.plots import PLOT_MODES, render, barchart, scatterplot, wait_for_plots
+from core.results import get_sink, TrialStream
+from core.profiling import create_timer, profiled
+from core.cache import get_cache
 from collections import Counter
+import argparse
+import copy
 import numpy as np
 import time
 import datetime
 import math
 
+# the deck engines that the experiments can run on, 'list' is the original pile of Card objects
+# 'batch' does not keep a deck around, it deals every hand of an experiment at once (see core.trials)
+# and its experiments can be spread over several worker processes
+DECK_ENGINES = {'list': Deck, 'array': ArrayDeck}
+BATCH_ENGINE = 'batch'
+# how the batch engine looks for a royal flush: 'rejection' deals batches of hands until one shows up,
+# 'geometric' draws the number of hands it would take straight from its exact distribution
+ROYAL_FLUSH_MODES = ('rejection', 'geometric')
+# how the charts are created unless an experiment gets plots=..., see core.plots:
+# deferred charts are rendered by a background process after the experiment has computed its results
+PLOTS = 'deferred'
+# the directory of the results store (see core.results) unless an experiment gets results=..., 'off' keeps none
+RESULTS = 'results'
+# the arguments that decide what an experiment deals, they are saved with its checkpoint
+CHECKPOINT_KEYS = ('engine', 'attempts', 'experiments', 'seed', 'ci_halfwidth', 'max_samples', 'time_budget',
+                   'mode', 'batch', 'trials', 'exact', 'faces')
+
+
+# creates a deck using the chosen engine
+def create_deck(valueStart, valueEnd, numSuits, engine='list', seed=None):
+    assert engine in DECK_ENGINES, 'Unknown deck engine ' + str(engine)
+    if isinstance(seed, np.random.SeedSequence):
+        seed = int(seed.generate_state(1)[0])  # the decks take a plain integer seed
+    return DECK_ENGINES[engine](valueStart, valueEnd, numSuits, seed=seed)
+
+
+# the array engine deals integer codes instead of Card objects, these helpers read both
+# a hand is only a few cards, decoding them as plain integers is quicker than numpy on such small arrays
+def get_faces(cards):
+    if isinstance(cards, np.ndarray):
+        return [code & FACE_MASK for code in cards.tolist()]
+    return [x.getFace() for x in cards]
+
+
+def get_suits(cards):
+    if isinstance(cards, np.ndarray):
+        return [code >> SUIT_SHIFT for code in cards.tolist()]
+    return [x.getSuit() for x in cards]
+
 
 # returns True if all suits in a card list are identical (e.g. all hearts)
 def is_flush(cards):
     assert not len(cards) == 0, "Empty cards hand cannot be determined"
     # This is a list comprehension to get all suits in a list
-    suits = [x.getSuit() for x in cards]
+    suits = get_suits(cards)
 
     # how many variance of suits in a list? if it is 5 then it's a flush
     return suits.count(suits[0]) == len(suits)  # take the first item and count it to the length of occurrences
@@ -20,11 +73,11 @@ def is_flush(cards):
 # returns True if all suits is Heart in which this will be represented using number '0' of suit
 def is_royal_flush(cards):
     # Let 0 is the Heart
-    if any(x.getSuit() != 0 for x in cards):
+    if any(x != 0 for x in get_suits(cards)):
         return False
     else:
         # get the face number of the cards
-        faces = [x.getFace() for x in cards]
+        faces = get_faces(cards)
         royal_flush = [1, 10, 11, 12, 13]
         if set(royal_flush) == set(faces):  # compare faces list to a royal flush model using set No repetition allowed
             return True
@@ -37,7 +90,7 @@ def is_pair(cards):
     assert not len(cards) == 0 or len(cards) > 5, "Empty cards input is not valid"
     # Using List comprehensions to get all faces (number of cards)
     # Counter method from collections library is being used for finding the occurrences of an item in a list
-    occurrences = dict(Counter([x.getFace() for x in cards]))  # returns a dictionary object
+    occurrences = dict(Counter(get_faces(cards)))  # returns a dictionary object
 
     # if the length is less than 3, the possible sets are {[n,1],[n,4]} and {[n,5]} which n is the face number
     # if the length is more than 4, then no repetition in the set
@@ -51,255 +104,615 @@ def is_pair(cards):
 
 
 # This is a helper method to write down the results from any function
+# A log never replaces another one, a second log in the same second gets a number after the time
 def save_log(text, file_name):
-    file = open(file_name + '-' + str(datetime.datetime.now().strftime("%Y_%m_%d_%H_%M_%S")) + '.log', 'w')
+    stamp = file_name + '-' + str(datetime.datetime.now().strftime("%Y_%m_%d_%H_%M_%S"))
+    number = 0
+    while True:
+        try:
+            file = open(stamp + ('-' + str(number) if number else '') + '.log', 'x')
+            break
+        except FileExistsError:
+            number += 1
     for i in text:
-        file.write(i + '\n')
+        file.write(str(i) + '\n')
     file.close()
 
 
-# creates bar charts image using matplotlib
-def create_barchart(obj_dict, desc, file_name):
+# Saves the raw numbers of a finished experiment and their statistics in the results store,
+# metadata describes the run (see core.results.ResultSink.record). Nothing is saved with results='off'
+def store_results(results, experiment, metadata, trials, stats=None):
+    if results is None or results == 'off':
+        return None
+    return get_sink(results).record(experiment, metadata, trials, stats)
+
+
+# The raw trials of a run go to the results store while it runs (see core.results.TrialStream),
+# a run resumed from a checkpoint continues at position, the (run id, trials written) saved with it.
+# Returns None with results='off'
+def open_trials(results, metrics, position=None):
+    if results is None or results == 'off':
+        return None
+    run, sent = position or (None, 0)
+    return TrialStream(get_sink(results), metrics, run, sent)
+
+
+# creates bar charts image using matplotlib, plots says how (see core.plots)
+def create_barchart(obj_dict, desc, file_name, plots=PLOTS):
     try:
         assert len(desc) != 0 or len(obj_dict) != 0, 'Arguments cannot be empty'
-        # pyplot figure must have a new instance number to work on with everytime this method is called
-        pyplot.figure()
-        interval = 5 if len(obj_dict) > 50 else 1  # this is the interval code, this will trick the xticks just to print which numbers needed
-        x = np.arange(len(obj_dict))  # create np array for x label, for the interval x-axis label
-        ticks = np.arange(1, len(obj_dict) + 1)  # this is the actual value of each bar
-        pyplot.bar(range(len(obj_dict)), obj_dict.values(), align='center')
-        pyplot.xticks(x[::interval], ticks[::interval])
-        pyplot.xlabel(desc['xlabel'])
-        pyplot.ylabel(desc['ylabel'])
-        pyplot.title(desc['title'])
-        pyplot.tight_layout()
-        pyplot.savefig(file_name + '-' + str(datetime.datetime.now().strftime("%Y_%m_%d_%H_%M_%S")))
+        # the file name is taken now, a deferred chart keeps the time of its experiment
+        path = file_name + '-' + str(datetime.datetime.now().strftime("%Y_%m_%d_%H_%M_%S"))
+        render(barchart, (list(obj_dict.values()), desc, path), plots)
     except AssertionError:
         raise AssertionError
     except Exception as e:
         print(e)
 
 
-# create scatter plot image using matplotlib library
-def create_scatterplot(x, y, desc, file_name):
+# create scatter plot image using matplotlib library, plots says how (see core.plots)
+def create_scatterplot(x, y, desc, file_name, plots=PLOTS):
     try:
         assert len(desc) != 0 or len(y) != 0 or len(x) != 0, 'Arguments cannot be empty'
-        # pyplot figure must have a new instance number to work on with everytime this method is called
-        pyplot.figure()
-        pyplot.scatter(x, y, s=3, c='red', alpha=0.75)  # size 3 using red color not too big using 0.75 alpha transparency
-        pyplot.xlabel(desc['xlabel'])
-        pyplot.ylabel(desc['ylabel'])
-        pyplot.title(desc['title'])
-        pyplot.savefig(file_name + '-' + str(datetime.datetime.now().strftime("%Y_%m_%d_%H_%M_%S")))
+        path = file_name + '-' + str(datetime.datetime.now().strftime("%Y_%m_%d_%H_%M_%S"))
+        render(scatterplot, (list(x), list(y), desc, path), plots)
     except AssertionError:
         raise AssertionError
     except Exception as e:
         print(e)
 
 
+# Experiments can run until a target precision instead of a fixed number of experiments:
+# ci_halfwidth is the wanted half width of the 95% confidence interval of every result,
+# max_samples (cards or hands) and time_budget (seconds) put a limit on the run.
+# Returns None when none of them is given
+def create_stopping_rule(kwargs):
+    if all(kwargs.get(key) is None for key in ('ci_halfwidth', 'max_samples', 'time_budget')):
+        return None
+    return StoppingRule(kwargs.get('ci_halfwidth'), kwargs.get('max_samples'), kwargs.get('time_budget'))
+
+
+# A long experiment keeps its progress in a checkpoint file when it gets checkpoint=path,
+# it is saved every checkpoint_interval seconds (30 by default) and when the run is interrupted.
+# With resume=True the run continues from that file, with the configuration saved in it.
+# Returns None when no checkpoint file is given
+def open_checkpoint(name, kwargs, **config):
+    path = kwargs.get("checkpoint")
+    if not path:
+        return None
+    config.update((key, kwargs[key]) for key in CHECKPOINT_KEYS if key in kwargs)
+    if config.get('seed') is None:
+        config['seed'] = fresh_seed()
+    checkpoint = Checkpoint(path, name, config, kwargs.get("checkpoint_interval", 30))
+    if kwargs.get("resume", False):
+        checkpoint.load()
+    return checkpoint
+
+
+# log lines with the time every phase took, when the run was profiled (profile=True or a PhaseTimer)
+def describe_phases(timer):
+    if not timer:
+        return []
+    lines = ['Time spent in every phase:'] + timer.report()
+    for line in lines:
+        print(line)
+    return lines
+
+
+# log lines that tell how many samples an adaptive run has actually used
+def describe_samples(experiments, attempts, rule):
+    if rule is None:
+        return []
+    return ['Samples used: {0} in {1} experiments of {2}'.format(str(experiments * attempts), str(experiments), str(attempts)),
+            # a rule that never fired means the run got through all its experiments first
+            'Stopped because: ' + (rule.reason or 'experiment limit reached')]
+
+
 # This experiments are intended to find the average (mean) distribution of all faces
 def proving_fairness(**kwargs):
     try:
         # start timer
         start = time.time()
-        # creates a deck of card with 52 cards
-        deck = Deck(1, 13, 4)
-        deck.shuffle()
-        mean_list = []
+        # creates a deck of card with 52 cards, unless another deck shape is given
+        engine = kwargs.get("engine", BATCH_ENGINE)
+        faces, suit = tuple(kwargs.get("faces", STANDARD_FACES)), kwargs.get("suit", 4)
+        plots = kwargs.get("plots", PLOTS)
+        assert plots in PLOT_MODES, 'Unknown plot mode ' + str(plots)
+        # the statistics are updated after every experiment, the list is only kept for the plots
+        # and the raw means are streamed into the results store, so a run of any length takes constant memory
+        mean_list, stats = [], RunningStats()
+        trials = open_trials(kwargs.get("results", RESULTS), ('mean',))
+        progress = kwargs.get("progress")  # optional callback that gets the statistics so far
         # init variables for iteration process
         attempts = kwargs["attempts"] if ("attempts" in kwargs) else 1000
-        experiments = kwargs["experiments"] if ("experiments" in kwargs) else 100
+        rule = create_stopping_rule(kwargs)
+        experiments = kwargs.get("experiments", 100 if rule is None else None)
+        timer = create_timer(kwargs.get("profile"))  # time spent in every phase, see core.profiling
         n = 0
-        while n < experiments:
-            counter, total = 0, 0
-            while counter < attempts:
-                card = deck.drawCard()  # get a card
-                total += card.getFace()  # increment the number of faces from a card
-                deck.placeCardTop(card)  # after done with the card, put it back again
-                deck.shuffle()
-                counter += 1
-            mean_list.append(total / attempts)
-            n += 1
+
+        # saves the mean of one experiment and tells if the run can stop early
+        def record(mean):
+            with timer.phase('aggregate'):
+                if plots != 'off':
+                    mean_list.append(mean)
+                if trials:
+                    trials.add(mean=mean)
+                stats.add(mean)
+                if progress:
+                    progress(stats)
+                return rule is not None and rule.done(stats.count, stats.count * attempts, [stats.half_width()])
+
+        if engine == BATCH_ENGINE:
+            # every attempt draws one card from the full deck, so a whole experiment is dealt in one call
+            task, args = profiled(fairness_trial, (faces, suit, attempts), timer)
+            for mean in iter_experiments(task, args, experiments, kwargs.get("seed"),
+                                         kwargs.get("workers", 1), kwargs.get("runner")):
+                if record(timer.collect(mean)):
+                    break
+        else:
+            deck = create_deck(*faces, suit, engine, kwargs.get("seed"))
+            deck.shuffle()
+            while experiments is None or n < experiments:
+                counter, total = 0, 0
+                while counter < attempts:
+                    with timer.phase('deal'):
+                        card = deck.drawCard()  # get a card
+                        total += card.getFace()  # increment the number of faces from a card
+                        deck.placeCardTop(card)  # after done with the card, put it back again
+                    with timer.phase('shuffle'):
+                        deck.shuffle(top=1)  # only the top card is drawn
+                    counter += 1
+                n += 1
+                if record(total / attempts):
+                    break
         # create scatter plot and bar graph
         desc = {'title': 'Mean Distribution', 'xlabel': 'Experiment times', 'ylabel': 'Mean'}
-        create_scatterplot(np.arange(1, 101), mean_list, desc, 'proving-fairness-scatterplot')
-        # Here I am trying to create dict object from range and the mean itself for creating barchart
-        keys = range(0, len(mean_list))
-        d_mean = dict(zip(keys, mean_list))
-        create_barchart(d_mean, desc, 'proving-fairness-barchart')
+        if plots != 'off':
+            with timer.phase('plot'):
+                create_scatterplot(np.arange(1, len(mean_list) + 1), mean_list, desc, 'proving-fairness-scatterplot', plots)
+                # Here I am trying to create dict object from range and the mean itself for creating barchart
+                keys = range(0, len(mean_list))
+                d_mean = dict(zip(keys, mean_list))
+                create_barchart(d_mean, desc, 'proving-fairness-barchart', plots)
 
         # To describe only image without the actual results are vague, we need the actual results
         # for translating those figures
-        arr = np.array(mean_list)
-        std = np.std(arr, ddof=1)
-        variance = np.var(arr)
+        std = stats.std(ddof=1)
+        variance = stats.variance()
         delta = time.time() - start
-        max_val, min_val = np.amax(arr), np.amin(arr)
-        logs = ['Final Average from 100 trials is {0}'.format(np.mean(mean_list)),
-                'Standard Deviation for this model from 100 mean average is ' + str(std),
-                'Variance for this model from 100 mean is ' + str(variance),
+        max_val, min_val = stats.max, stats.min
+        low, high = stats.confidence_interval()
+        logs = ['Final Average from {0} trials is {1}'.format(stats.count, stats.mean),
+                'Standard Deviation for this model from {0} mean average is {1}'.format(stats.count, std),
+                'Variance for this model from {0} mean is {1}'.format(stats.count, variance),
                 'Min value : ' + str(min_val) + " and max value : " + str(max_val),
+                '95% confidence interval of the average is [{0}, {1}]'.format(str(low), str(high)),
                 'Time to complete calculation ' + str(math.ceil(delta * 100) / 100) + ' seconds']
+        logs += describe_samples(stats.count, attempts, rule)
+        logs += describe_phases(timer)
+        if trials:
+            trials.finish('proving_fairness',
+                          {'engine': engine, 'faces': faces, 'suits': suit, 'seed': kwargs.get("seed"),
+                           'workers': kwargs.get("workers", 1), 'attempts': attempts, 'started': start, 'seconds': delta},
+                          {'mean': stats})
         save_log(logs, 'proving-fairness')
         print('Proving Fairness has completed in', math.ceil(delta*100)/100, 'seconds')
     except Exception as e:
         print(e)
         save_log([e], 'error-proving-fairness')
+        # the command line and job files need to know that the experiment failed
+        if kwargs.get("raise_errors", False):
+            raise
 
 
 # This experiments are intended to find 5 royal flush of hearts hands from 4 suits (Suit no. 0)
-def royal_flush_chance(suit=4):
-    # creates deck and shuffle the cards
-    deck = Deck(1, 13, suit)
-    deck.shuffle()
-    probability_list = []  # this is the result container
-    text = []
-    experiment = 0
-    # 5 experiment of finding royal flush from 4 suits
-    while experiment < 5:
-        # start timer
-        start = time.time()
-        attempts = 0
-        is_found = False
-        while not is_found:
-            # take 5 cards from top
-            cards = deck.draw_cards()
-            # put back 5 cards into the deck
-            deck.place_cards(cards)
-            deck.shuffle()
-            # determine if the drawn cards are royal flush
-            if is_royal_flush(cards):
-                is_found = True
-            attempts += 1
-        probability_list.append(1 / attempts)
-        end = time.time()
-        text.append('Found Royal Flush in ' + str(math.floor(end - start)) + ' s in attempts number: ' + str(attempts))
-        experiment += 1
+def royal_flush_chance(suit=4, engine=BATCH_ENGINE, seed=None, workers=1, mode='rejection', batch=ROYAL_FLUSH_BATCH,
+                       experiments=5, runner=None, checkpoint=None, resume=False, checkpoint_interval=30, plots=PLOTS,
+                       results=RESULTS, profile=None, raise_errors=False):
+    began = time.time()
+    timer = create_timer(profile)
+    checkpoint = open_checkpoint('royal_flush_chance', locals(), suit=suit)
+    if checkpoint is not None:
+        suit, engine, seed, mode, batch, experiments = (checkpoint.config[key] for key in
+                                                        ('suit', 'engine', 'seed', 'mode', 'batch', 'experiments'))
+    assert mode in ROYAL_FLUSH_MODES, 'Unknown royal flush mode ' + str(mode)
+    assert plots in PLOT_MODES, 'Unknown plot mode ' + str(plots)
+    state = checkpoint.state if checkpoint is not None else None
+    # (attempts, seconds) of every royal flush found so far
+    found = state['found'] if state else []
+    deck = None
+    if state and state['deck'] is not None:
+        deck = create_deck(1, 13, suit, engine)
+        deck.set_state(state['deck'])
+
+    # saves a found royal flush, a checkpoint is only ever taken here where nothing is half done
+    def record(attempts, seconds):
+        found.append((attempts, seconds))
+        if checkpoint is not None:
+            # the deck keeps changing while the next royal flush is searched, so the checkpoint gets a snapshot
+            checkpoint.update({'found': list(found), 'deck': None if deck is None else deck.get_state()})
+            checkpoint.save()
+
+    try:
+        if engine == BATCH_ENGINE:
+            if mode == 'geometric':
+                task, args = royal_flush_geometric_trial, (suit,)
+            else:
+                get_classifier(suit)  # the lookup table is built here once, before any worker needs it
+                task, args = royal_flush_trial, (suit, batch)
+            # the searches do not depend on each other, so they can run on different cores
+            task, args = profiled(task, args, timer)
+            for result in iter_experiments(task, args, experiments, seed, workers, runner, start=len(found)):
+                record(*timer.collect(result))
+        else:
+            if deck is None:
+                # creates deck and shuffle the cards
+                deck = create_deck(1, 13, suit, engine, seed)
+                deck.shuffle()
+            # 5 experiment of finding royal flush from 4 suits
+            while len(found) < experiments:
+                # start timer
+                start = time.time()
+                attempts = 0
+                is_found = False
+                while not is_found:
+                    # take 5 cards from top
+                    with timer.phase('deal'):
+                        cards = deck.draw_cards()
+                    # determine if the drawn cards are royal flush
+                    with timer.phase('classify'):
+                        if is_royal_flush(cards):
+                            is_found = True
+                    # put back 5 cards into the deck
+                    with timer.phase('deal'):
+                        deck.place_cards(cards)
+                    with timer.phase('shuffle'):
+                        deck.shuffle(top=5)  # only the 5 top cards are drawn
+                    attempts += 1
+                record(attempts, time.time() - start)
+    except KeyboardInterrupt:
+        # the royal flushes found so far are kept, the run can be resumed from the checkpoint
+        if checkpoint is not None:
+            checkpoint.save(force=True)
+        raise
+    except Exception as e:
+        if checkpoint is not None:
+            checkpoint.save(force=True)
+        print(e)
+        save_log([e], 'error-royal-flush')
+        if raise_errors:
+            raise
+        return
+    probability_list = [1 / attempts for attempts, seconds in found]  # this is the result container
+    text = ['Found Royal Flush in ' + str(math.floor(seconds)) + ' s in attempts number: ' + str(attempts)
+            for attempts, seconds in found]
     # this section is for creating scatter plot  
     desc = {'title': 'Probability Distribution', 'xlabel': 'Experiment Number', 'ylabel': 'Probability'}
-    create_scatterplot(np.arange(1, 6), probability_list, desc, 'royal-flush')
+    with timer.phase('plot'):
+        create_scatterplot(np.arange(1, len(probability_list) + 1), probability_list, desc, 'royal-flush', plots)
+    text += describe_phases(timer)
+    attempts_list, seconds_list = [attempts for attempts, seconds in found], [seconds for attempts, seconds in found]
+    store_results(results, 'royal_flush_chance',
+                  {'engine': engine, 'faces': STANDARD_FACES, 'suits': suit,
+                   'seed': seed, 'workers': workers, 'started': began, 'seconds': time.time() - began},
+                  {'attempts': attempts_list, 'seconds': seconds_list}, {'attempts': RunningStats().add_all(attempts_list)})
     save_log(text, 'royal-flush')  # saves the log
+    if checkpoint is not None:
+        checkpoint.remove()
     print('Royal Flush Experiment has completed')
 
 
 # This experiments are for finding pair and flush when drawing 5 cards from a deck
 def chances_of_hands(suit=4, dynamic_suit=False, **kwargs):
+    checkpoint = None
     try:
         # start timer
         start = time.time()
+        checkpoint = open_checkpoint('chances_of_hands', kwargs, suit=suit, dynamic_suit=dynamic_suit)
+        if checkpoint is not None:
+            # a resumed run deals exactly the cards the interrupted one would have dealt
+            kwargs = dict(kwargs, **checkpoint.config)
+            suit, dynamic_suit = kwargs.pop('suit'), kwargs.pop('dynamic_suit')
+        # the exact probabilities are counted with core.exact, they are used to check the simulation
+        faces = tuple(kwargs.get("faces", STANDARD_FACES))  # the face range of the deck, (1, 13) by default
+        exact = hand_probabilities(*faces, suit)
+        exact_pair, exact_flush = float(exact['pair']), float(exact['flush'])
+        if kwargs.get("exact", False):
+            # in exact mode nothing is simulated at all
+            if dynamic_suit:
+                return {'pair': exact_pair, 'flush': exact_flush}
+            save_log(['Exact probabilities for pair and flush are {0}, {1} respectively'.format(str(exact_pair), str(exact_flush))],
+                     'chances-of-hands-exact')
+            print('Exact chances of hands are', exact_pair, 'for pair and', exact_flush, 'for flush')
+            return
         # init all the neccessary objects e.g. deck, mean, and counters
-        deck = Deck(1, 13, suit)
+        engine = kwargs.get("engine", BATCH_ENGINE)
+        plots = kwargs.get("plots", PLOTS)
+        assert plots in PLOT_MODES, 'Unknown plot mode ' + str(plots)
         mean_pair, mean_flush = [], []
+        stats_pair, stats_flush = RunningStats(), RunningStats()
+        progress = kwargs.get("progress")  # optional callback that gets the statistics so far
         attempts = kwargs["attempts"] if ("attempts" in kwargs) else 1000
-        experiments = kwargs["experiments"] if ("experiments" in kwargs) else 100
-        counter = 0
-        # there will be 100 experiments conduct each to get 100 data of pair and flush from 1000 attempts
-        while counter < experiments:
-            i, pair_counter, flush_counter = 0, 0, 0
-            while i < attempts:  # when i equals to 1000 attempt the iteration will stop
-                deck.shuffle()
-                # take 5 cards from top
-                cards = deck.draw_cards()
-                # put back the cards
-                deck.place_cards(cards)
-                # determine the drawn cards are pair or flush
-                # this will reduce the computational cost :
-                # Pair and Flush cannot be intersect, (a card hand can be pair or flush but CANNOT AT THE SAME TIME)
-                if is_flush(cards):  # if it is a card then it CANNOT be a pair
-                    flush_counter += 1
-                elif is_pair(cards):  # if if is a pair then it CANNOT be a flush
-                    pair_counter += 1
-                i += 1
-            # saves all the results into a list
-            mean_pair.append(pair_counter / attempts)  # there will be 100 items here
-            mean_flush.append(flush_counter / attempts)  # there will be 100 items here
+        rule = create_stopping_rule(kwargs)
+        experiments = kwargs.get("experiments", 100 if rule is None else None)
+        timer = create_timer(kwargs.get("profile"))  # time spent in every phase, see core.profiling
+        # The points of a suit sweep are looked up in the result cache first (see core.cache). Only a seeded run
+        # that does not stop on a time budget is repeatable, the others are never cached
+        cache = None
+        if dynamic_suit and kwargs.get("cache", True) and kwargs.get("seed") is not None and \
+                kwargs.get("time_budget") is None:
+            cache = get_cache()
+            config = {'experiment': 'chances_of_hands', 'faces': faces, 'suit': suit, 'engine': engine,
+                      'attempts': attempts, 'experiments': experiments, 'seed': kwargs.get("seed"),
+                      'ci_halfwidth': kwargs.get("ci_halfwidth"), 'max_samples': kwargs.get("max_samples")}
+            cached = cache.get(config)
+            if cached is not None:
+                return cached
+        # the lists are only needed for the plots, a run without them (or a point of a suit sweep) does not keep them
+        keep_means = not dynamic_suit and plots != 'off'
+        counter, deck, position = 0, None, None
+        state = checkpoint.state if checkpoint is not None else None
+        if state:
+            counter, position = state['completed'], state.get('trials', (None, counter))
+            stats_pair, stats_flush = state['stats']
+            if state['deck'] is not None:
+                deck = create_deck(*faces, suit, engine)
+                deck.set_state(state['deck'])
+            if keep_means:
+                # the lists may have grown past the last finished experiment before they were saved
+                mean_pair, mean_flush = (values[:counter] for values in state['means'])
+        # the raw numbers are streamed into the results store while the run goes on (a suit sweep stores its own)
+        trials = None if dynamic_suit else open_trials(kwargs.get("results", RESULTS), ('pair', 'flush'), position)
+        if trials and checkpoint is not None:
+            # the trials on disk always match the checkpoint, a resumed run adds the ones after it
+            checkpoint.on_save = trials.sync
+
+        # every experiment updates the statistics straight away
+        # returns True when the run has reached its target precision or budget
+        def record(pair, flush):
+            nonlocal counter
             counter += 1
-
+            stats_pair.add(pair)
+            stats_flush.add(flush)
+            if keep_means:
+                mean_pair.append(pair)  # there will be 100 items here
+                mean_flush.append(flush)  # there will be 100 items here
+            if trials:
+                trials.add(pair=pair, flush=flush)
+            if progress:
+                progress(stats_pair, stats_flush)
+            if checkpoint is not None:
+                # The experiment is complete here. The lists are only appended to, they are kept by reference
+                # and read up to counter, while the statistics and the deck, which the next experiment changes,
+                # are small snapshots. Nothing here grows with the length of the run
+                checkpoint.update({'completed': counter, 'stats': (copy.copy(stats_pair), copy.copy(stats_flush)),
+                                   'means': (mean_pair, mean_flush), 'deck': None if deck is None else deck.get_state(),
+                                   'trials': trials and (trials.run, counter)})
+                checkpoint.save()
+            if rule is None:
+                return False
+            hands_dealt = stats_pair.count * attempts
+            # both are proportions of hands, their interval comes from the number of hands dealt so far
+            half_widths = [proportion_half_width(stats_pair.mean * hands_dealt, hands_dealt),
+                           proportion_half_width(stats_flush.mean * hands_dealt, hands_dealt)]
+            return rule.done(stats_pair.count, hands_dealt, half_widths)
+
+        if engine == BATCH_ENGINE:
+            get_classifier(suit, faces)  # the lookup table is built here once, before any worker needs it
+            # all the hands of one experiment are dealt and classified at once, experiments can run in parallel
+            # a resumed run starts at the first experiment that was not finished
+            task, args = profiled(hands_trial, (faces, suit, attempts), timer)
+            for result in iter_experiments(task, args, experiments, kwargs.get("seed"),
+                                           kwargs.get("workers", 1), kwargs.get("runner"), start=counter):
+                pair, flush = timer.collect(result)
+                with timer.phase('aggregate'):
+                    stop = record(pair, flush)
+                if stop:
+                    break
+        else:
+            if deck is None:
+                deck = create_deck(*faces, suit, engine, kwargs.get("seed"))
+            # there will be 100 experiments conduct each to get 100 data of pair and flush from 1000 attempts
+            while experiments is None or counter < experiments:
+                i, pair_counter, flush_counter = 0, 0, 0
+                while i < attempts:  # when i equals to 1000 attempt the iteration will stop
+                    with timer.phase('shuffle'):
+                        deck.shuffle(top=5)  # only the 5 top cards are drawn
+                    with timer.phase('deal'):
+                        # take 5 cards from top
+                        cards = deck.draw_cards()
+                        # put back the cards
+                        deck.place_cards(cards)
+                    # determine the drawn cards are pair or flush
+                    # this will reduce the computational cost :
+                    # Pair and Flush cannot be intersect, (a card hand can be pair or flush but CANNOT AT THE SAME TIME)
+                    with timer.phase('classify'):
+                        if is_flush(cards):  # if it is a card then it CANNOT be a pair
+                            flush_counter += 1
+                        elif is_pair(cards):  # if if is a pair then it CANNOT be a flush
+                            pair_counter += 1
+                    i += 1
+                # saves all the results
+                with timer.phase('aggregate'):
+                    stop = record(pair_counter / attempts, flush_counter / attempts)
+                if stop:
+                    break
+
+        if checkpoint is not None:
+            checkpoint.remove()
         # to avoid any unnecessary repetition code,
         # I'm using the same function but create a flag in this function to avoid plot creation
         if dynamic_suit:
             # when dynamic suit mode is Active (True) this function will stop here
             # this will returns a dictionary object contains both mean for pair and flush
-            return {'pair': np.mean(mean_pair), 'flush': np.mean(mean_flush)}
-
-        desc_pair = {'title': 'Probability Distribution of Pair Hand', 'xlabel': 'Number of Experiments',
-                     'ylabel': 'Probability'}
-        create_scatterplot(range(1, 101), mean_pair, desc_pair, 'chances-of-pair-scatter')
-        # Here I am trying to create dict object from range and the mean itself for creating barchart
-        keys = range(0, len(mean_pair))
-        d_pair = dict(zip(keys, mean_pair))
-        create_barchart(d_pair, desc_pair, 'chance-of-pair-bar')
-
-        desc_flush = {'title': 'Probability Distribution of Flush Hand', 'xlabel': 'Number of Experiments',
-                     'ylabel': 'Probability'}
-        create_scatterplot(range(1, 101), mean_flush, desc_flush, 'chances-of-flush-scatter')
-        # Here I am trying to create dict object from range and the mean itself for creating barchart
-        keys = range(0, len(mean_flush))
-        d_flush = dict(zip(keys, mean_flush))
-        create_barchart(d_flush, desc_flush, 'chance-of-flush-bar')
+            result = {'pair': stats_pair.mean, 'flush': stats_flush.mean, 'samples': stats_pair.count * attempts}
+            if cache is not None:
+                cache.put(config, result)
+            return result
+
+        with timer.phase('plot'):
+            # without plots the lists are empty and nothing is rendered
+            desc_pair = {'title': 'Probability Distribution of Pair Hand', 'xlabel': 'Number of Experiments',
+                         'ylabel': 'Probability'}
+            create_scatterplot(range(1, len(mean_pair) + 1), mean_pair, desc_pair, 'chances-of-pair-scatter', plots)
+            # Here I am trying to create dict object from range and the mean itself for creating barchart
+            keys = range(0, len(mean_pair))
+            d_pair = dict(zip(keys, mean_pair))
+            create_barchart(d_pair, desc_pair, 'chance-of-pair-bar', plots)
+
+            desc_flush = {'title': 'Probability Distribution of Flush Hand', 'xlabel': 'Number of Experiments',
+                          'ylabel': 'Probability'}
+            create_scatterplot(range(1, len(mean_flush) + 1), mean_flush, desc_flush, 'chances-of-flush-scatter', plots)
+            # Here I am trying to create dict object from range and the mean itself for creating barchart
+            keys = range(0, len(mean_flush))
+            d_flush = dict(zip(keys, mean_flush))
+            create_barchart(d_flush, desc_flush, 'chance-of-flush-bar', plots)
 
         # To describe only image without the actual results are vague, we need the actual results
         # for translating those figures
-        arr_pair, arr_flush = np.array(mean_pair), np.array(mean_flush)
-        std_pair, std_flush = np.std(arr_pair, ddof=1), np.std(arr_flush, ddof=1)
-        variance_pair, variance_flush = np.var(arr_pair), np.var(arr_flush)
+        std_pair, std_flush = stats_pair.std(ddof=1), stats_flush.std(ddof=1)
+        variance_pair, variance_flush = stats_pair.variance(), stats_flush.variance()
         delta = time.time() - start
-        max_pair, min_pair = np.amax(arr_pair), np.amin(arr_pair)
-        max_flush, min_flush = np.amax(arr_flush), np.amin(arr_flush)
-        logs = ['Mean values for pair and flush are {0}, {1} respectively'.format(str(np.mean(mean_pair)), str(np.mean(mean_flush))),
+        max_pair, min_pair = stats_pair.max, stats_pair.min
+        max_flush, min_flush = stats_flush.max, stats_flush.min
+        logs = ['Mean values for pair and flush are {0}, {1} respectively'.format(str(stats_pair.mean), str(stats_flush.mean)),
                 'Standard Deviation for pair and flush are {0}, {1} respectively'.format(str(std_pair), str(std_flush)),
                 'Variance for for pair and flush are {0}, {1} respectively'.format(str(variance_pair), str(variance_flush)),
                 'Minimum and maximum value for pair are {0}, {1}'.format(str(min_pair), str(max_pair)),
                 'Minimum and maximum value for flush are {0}, {1}'.format(str(min_flush), str(max_flush)),
+                'Exact probabilities for pair and flush are {0}, {1} respectively'.format(str(exact_pair), str(exact_flush)),
+                '95% confidence half widths for pair and flush are {0}, {1} respectively'.format(
+                    str(stats_pair.half_width()), str(stats_flush.half_width())),
+                'Simulation error (mean - exact) for pair and flush are {0}, {1} respectively'.format(
+                    str(stats_pair.mean - exact_pair), str(stats_flush.mean - exact_flush)),
                 'Time to complete calculation ' + str(math.ceil(delta * 100) / 100) + ' seconds']
+        logs += describe_samples(stats_pair.count, attempts, rule)
+        logs += describe_phases(timer)
+        if trials:
+            trials.finish('chances_of_hands',
+                          {'engine': engine, 'faces': faces, 'suits': suit, 'seed': kwargs.get("seed"),
+                           'workers': kwargs.get("workers", 1), 'attempts': attempts, 'started': start, 'seconds': delta},
+                          {'pair': stats_pair, 'flush': stats_flush})
         save_log(logs, 'chances-of-hands')
 
         print('Chances of hands has completed in ', str(math.ceil(delta * 100) / 100), 'seconds')
+    except KeyboardInterrupt:
+        # the work done so far is kept, the run can be resumed from the checkpoint
+        if checkpoint is not None:
+            checkpoint.save(force=True)
+        raise
     except Exception as e:
+        if checkpoint is not None:
+            checkpoint.save(force=True)
         print(e)
         save_log([e], 'error-chances-of-hands')
+        if kwargs.get("raise_errors", False):
+            raise
+
+
+# log line of changes_in_chance, a simulated probability also shows how far it is from the exact one
+def describe_probability(value, exact_value, exact=False):
+    if exact:
+        return 'Probability index: ' + str(value)
+    return 'Probability index: {0}, exact: {1}, difference: {2}'.format(str(value), str(exact_value), str(value - exact_value))
 
 
 # This experiment will compute the mean probability of n in the range from 1 to 10 suit
-def changes_in_chance(trials=10):
+def changes_in_chance(trials=10, engine=BATCH_ENGINE, exact=False, seed=None, workers=1, **kwargs):
+    checkpoint = None
     try:
         start = time.time()  # start timer
-        result, mean_pair, mean_flush = [], [], []  # initialize lists
+        checkpoint = open_checkpoint('changes_in_chance', dict(kwargs, trials=trials, engine=engine, exact=exact, seed=seed))
+        if checkpoint is not None:
+            kwargs = dict(kwargs, **checkpoint.config)
+            trials, engine, exact, seed = (kwargs.pop(key) for key in ('trials', 'engine', 'exact', 'seed'))
+        path, resume = kwargs.pop("checkpoint", None), kwargs.pop("resume", False)
+        shared = kwargs.pop("runner", None)  # the runner of the caller, e.g. of a whole job file
+        faces = tuple(kwargs.get("faces", STANDARD_FACES))
+        plots = kwargs.pop("plots", PLOTS)  # the suits themselves never create charts
+        timer = create_timer(kwargs.pop("profile", None))  # all the suits add their phases to the same timer
+        # without a seed the suits get fresh random seeds, their results are not worth caching
+        kwargs["cache"] = kwargs.get("cache", True) and seed is not None
+        assert plots in PLOT_MODES, 'Unknown plot mode ' + str(plots)
+        # the results of the suits that were already finished before the run was interrupted
+        completed = list(checkpoint.state or []) if checkpoint is not None else []
+        result, mean_pair, mean_flush, exact_pair, exact_flush = [], [], [], [], []  # initialize lists
         d_pair, d_flush = {}, {}  # initialize dict objects
-        # do experiments 10 times from 1 to 10 suit
-        for i in range(1, trials + 1):
-            # each suit will be run
-            d_mean = chances_of_hands(i, dynamic_suit=True)  # this will take the dict obj of result
-            result.append(d_mean)
-            mean_pair.append(d_mean['pair'])
-            mean_flush.append(d_mean['flush'])
-            d_pair[str(i)] = d_mean['pair']
-            d_flush[str(i)] = d_mean['flush']
+        # every suit gets its own seed, and all of them share one pool of workers
+        seeds = spawn_seeds(seed, trials)
+        with ExperimentRunner(workers) as runner:
+            if shared is not None:
+                runner = shared
+            # do experiments 10 times from 1 to 10 suit
+            for i in range(1, trials + 1):
+                if i <= len(completed):
+                    d_mean = completed[i - 1]
+                else:
+                    # each suit will be run, this will take the dict obj of result
+                    # the suit being run keeps its own checkpoint next to this one
+                    d_mean = chances_of_hands(i, dynamic_suit=True, engine=engine, exact=exact, seed=seeds[i - 1], runner=runner,
+                                              checkpoint=path and path + '-suit-' + str(i), resume=resume, profile=timer,
+                                              **kwargs)
+                    if d_mean is None:
+                        raise RuntimeError('Chances of hands failed for ' + str(i) + ' suits')
+                    completed.append(d_mean)
+                    # a finished suit is saved straight away, they take long enough
+                    if checkpoint is not None:
+                        checkpoint.update(list(completed))
+                        checkpoint.save(force=True)
+                d_exact = hand_probabilities(*faces, i)  # ground truth to compare the simulation with
+                exact_pair.append(float(d_exact['pair']))
+                exact_flush.append(float(d_exact['flush']))
+                result.append(d_mean)
+                mean_pair.append(d_mean['pair'])
+                mean_flush.append(d_mean['flush'])
+                d_pair[str(i)] = d_mean['pair']
+                d_flush[str(i)] = d_mean['flush']
 
         # This just labels
         desc_pair = {'title': 'Probability Distribution of Pair Hand', 'xlabel': 'Number of Suit',
                       'ylabel': 'Probability'}
         # create scatter and bar plot for each experiment
-        create_scatterplot(range(1, 11), mean_pair, desc_pair, 'changes-pair')
-        create_barchart(d_pair, desc_pair, 'change-pair-bar')
+        with timer.phase('plot'):
+            create_scatterplot(range(1, trials + 1), mean_pair, desc_pair, 'changes-pair', plots)
+            create_barchart(d_pair, desc_pair, 'change-pair-bar', plots)
         # creates log
-        mean_pair = ['Probability index: ' + str(x) for x in mean_pair]
+        # the trials of this run are the suits, trial i is the deck with i suits
+        store_results(kwargs.get("results", RESULTS), 'changes_in_chance',
+                      {'engine': 'exact' if exact else engine, 'faces': faces, 'suits': trials, 'seed': seed,
+                       'workers': workers, 'attempts': kwargs.get("attempts", 1000), 'started': start,
+                       'seconds': time.time() - start},
+                      {'pair': mean_pair, 'flush': mean_flush, 'exact_pair': exact_pair, 'exact_flush': exact_flush,
+                       'samples': [d_mean.get('samples', 0) for d_mean in result]})
+        mean_pair = [describe_probability(x, y, exact) for x, y in zip(mean_pair, exact_pair)]
         save_log(mean_pair, 'changes_in_chance_pair')
 
         # This just labels
         desc_flush = {'title': 'Probability Distribution of Flush Hand', 'xlabel': 'Number of Suit',
                       'ylabel': 'Probability'}
-        create_scatterplot(range(1, 11), mean_flush, desc_flush, 'changes-flush')
-        create_barchart(d_flush, desc_flush, 'change-flush-bar')
+        with timer.phase('plot'):
+            create_scatterplot(range(1, trials + 1), mean_flush, desc_flush, 'changes-flush', plots)
+            create_barchart(d_flush, desc_flush, 'change-flush-bar', plots)
         # creates log
-        mean_flush = ['Probability index: ' + str(x) for x in mean_flush]
+        mean_flush = [describe_probability(x, y, exact) for x, y in zip(mean_flush, exact_flush)]
         save_log(mean_flush, 'changes_in_chance_flush')
 
+        if checkpoint is not None:
+            checkpoint.remove()
+        describe_phases(timer)
         end = time.time()
         print('Changes in chance has completed in', math.floor(end-start), 'second')
+    except KeyboardInterrupt:
+        if checkpoint is not None:
+            checkpoint.save(force=True)
+        raise
     except Exception as e:
+        if checkpoint is not None:
+            checkpoint.save(force=True)
         print(e)
         save_log([e], 'error-changes-in-chance')
+        if kwargs.get("raise_errors", False):
+            raise
 
 
 # this function is to validate input from the user
@@ -337,7 +750,7 @@ def main():
             print('3. Back')
             val = input_validator('Choice : ', number=True)
             if val == 1:
-                print('You chose Royal Flush Experiment', 'The process will take a very long time to finish')
+                print('You chose Royal Flush Experiment', 'Please wait for the calculation is being carried out')
                 royal_flush_chance()
             elif val == 2:
                 print('You chose Pair and Flush Experiment', 'Please wait for the calculation is being carried out')
@@ -353,5 +766,141 @@ def main():
             print('unrecognized choice')
 
 
+# the experiments by name, as they are used on the command line, in job files and in checkpoint files
+EXPERIMENTS = {'proving_fairness': proving_fairness, 'royal_flush_chance': royal_flush_chance,
+               'chances_of_hands': chances_of_hands, 'changes_in_chance': changes_in_chance}
+
+
+# the keyword arguments a job file can give every experiment (see core.jobs.load_jobs), workers included
+COMMON_OPTIONS = ('engine', 'seed', 'workers', 'plots', 'profile', 'results')
+SAMPLING_OPTIONS = ('faces', 'attempts', 'experiments', 'ci_halfwidth', 'max_samples', 'time_budget')
+CHECKPOINT_OPTIONS = ('checkpoint', 'resume', 'checkpoint_interval')
+JOB_OPTIONS = {'proving_fairness': COMMON_OPTIONS + SAMPLING_OPTIONS + ('suit',),
+               'royal_flush_chance': COMMON_OPTIONS + CHECKPOINT_OPTIONS + ('suit', 'mode', 'batch', 'experiments'),
+               'chances_of_hands': COMMON_OPTIONS + SAMPLING_OPTIONS + CHECKPOINT_OPTIONS + ('suit', 'exact', 'cache'),
+               'changes_in_chance': COMMON_OPTIONS + SAMPLING_OPTIONS + CHECKPOINT_OPTIONS + ('trials', 'exact', 'cache')}
+
+
+# continues an interrupted experiment from its checkpoint file, with the configuration saved in it
+def resume_experiment(path, **kwargs):
+    experiment, config, state = read_checkpoint(path)
+    return EXPERIMENTS[experiment](**dict(config, checkpoint=path, resume=True, **kwargs))
+
+
+# 0 workers on the command line or in a job file means one worker for every core
+def worker_count(workers):
+    return None if workers == 0 else workers
+
+
+# Runs every job of a job file (see core.jobs.load_jobs) one after another in this process,
+# so the lookup tables are loaded and the worker pools are started once for the whole file.
+# A job that fails is reported and the others still run. Returns the number of failed jobs,
+# the experiments raise their errors here (raise_errors) instead of only logging them
+def run_jobs(path):
+    jobs = load_jobs(path, JOB_OPTIONS)
+    unknown = sorted(set(job['experiment'] for job in jobs) - set(EXPERIMENTS))
+    if unknown:
+        raise ValueError('Unknown experiments in ' + path + ': ' + ', '.join(map(str, unknown)))
+    runners, failed = {}, 0  # one runner for every number of workers the jobs ask for
+    try:
+        for number, job in enumerate(jobs, 1):
+            job = dict(job)
+            experiment, workers = job.pop('experiment'), worker_count(job.pop('workers', 1))
+            if workers not in runners:
+                runners[workers] = ExperimentRunner(workers)
+            print('Job {0} of {1}: {2} {3}'.format(number, len(jobs), experiment, job))
+            try:
+                EXPERIMENTS[experiment](workers=workers, runner=runners[workers], raise_errors=True, **job)
+            except Exception as e:
+                failed += 1
+                print('Job', number, 'has failed')
+                save_log(['Job {0} ({1}) failed: {2}'.format(number, experiment, e)], 'error-jobs')
+    finally:
+        for runner in runners.values():
+            runner.close()
+    print(len(jobs) - failed, 'of', len(jobs), 'jobs have completed')
+    return failed
+
+
+# The command line runs one experiment (e.g. main.py hands --suits 6 --seed 1), a job file (main.py jobs sweep.toml)
+# or resumes a checkpoint. Without any arguments the interactive menu starts
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description='Card experiments, the interactive menu starts when no command is given')
+    parser.add_argument('--resume', metavar='CHECKPOINT', help='continue an interrupted experiment from its checkpoint file')
+    commands = parser.add_subparsers(dest='command')
+    # options every experiment has
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--engine', choices=sorted(DECK_ENGINES) + [BATCH_ENGINE])
+    common.add_argument('--seed', type=int)
+    common.add_argument('--workers', type=int, help='worker processes, 0 uses every core')
+    common.add_argument('--plots', choices=PLOT_MODES, help='how the charts are created, ' + PLOTS + ' by default')
+    common.add_argument('--profile', action='store_true', default=None,
+                        help='print the time spent shuffling, dealing, classifying, aggregating and plotting')
+    common.add_argument('--results', metavar='DIRECTORY', help='results store of the runs, ' + RESULTS + ' by default, off for none')
+    # options of the experiments that deal a number of cards or hands in every experiment
+    sampling = argparse.ArgumentParser(add_help=False)
+    sampling.add_argument('--faces', type=int, nargs=2, metavar=('START', 'END'), help='face range of the deck')
+    sampling.add_argument('--attempts', type=int, help='cards or hands dealt in every experiment')
+    sampling.add_argument('--experiments', type=int)
+    sampling.add_argument('--ci-halfwidth', type=float, help='run until the 95%% confidence intervals are this narrow')
+    sampling.add_argument('--max-samples', type=int)
+    sampling.add_argument('--time-budget', type=float, metavar='SECONDS')
+    # options of the experiments that count pair and flush hands, fairness has none of them
+    counting = argparse.ArgumentParser(add_help=False)
+    counting.add_argument('--exact', action='store_true', default=None, help='count the exact probabilities instead')
+    counting.add_argument('--no-cache', dest='cache', action='store_false', default=None,
+                          help='compute every suit of a sweep again instead of using the result cache')
+    # changes_in_chance runs a whole range of suits, the others deal from one deck
+    suits = argparse.ArgumentParser(add_help=False)
+    suits.add_argument('--suits', dest='suit', type=int, help='number of suits of the deck')
+    resumable = argparse.ArgumentParser(add_help=False)
+    resumable.add_argument('--checkpoint', metavar='PATH', help='keep the progress in this file, see --resume')
+
+    command = commands.add_parser('fairness', parents=[common, suits, sampling], help='Proving Fairness')
+    command.set_defaults(experiment='proving_fairness')
+    command = commands.add_parser('royal-flush', parents=[common, suits, resumable], help='Royal Flush Experiment')
+    command.set_defaults(experiment='royal_flush_chance')
+    command.add_argument('--mode', choices=ROYAL_FLUSH_MODES)
+    command.add_argument('--batch', type=int, help='hands dealt at once by the batch engine')
+    command.add_argument('--experiments', type=int)
+    command = commands.add_parser('hands', parents=[common, suits, sampling, counting, resumable], help='Pair and Flush Experiment')
+    command.set_defaults(experiment='chances_of_hands')
+    command = commands.add_parser('changes', parents=[common, sampling, counting, resumable], help='Change in Chance')
+    command.set_defaults(experiment='changes_in_chance')
+    command.add_argument('--trials', type=int, help='number of decks, from 1 suit up to this many')
+    command = commands.add_parser('jobs', help='run every experiment of a job file (JSON, TOML or YAML)')
+    command.add_argument('file')
+    return parser.parse_args(argv)
+
+
+# the keyword arguments of the experiment chosen on the command line, options that are not given keep their defaults
+def command_options(options):
+    kwargs = {key: value for key, value in vars(options).items()
+              if value is not None and key not in ('command', 'experiment', 'resume')}
+    if 'workers' in kwargs:
+        kwargs['workers'] = worker_count(kwargs['workers'])
+    return kwargs
+
+
+# runs one experiment of the command line, it reports its own error, returns 1 when it failed and 0 otherwise
+def run_command(experiment, *args, **kwargs):
+    try:
+        experiment(*args, raise_errors=True, **kwargs)
+    except Exception:
+        return 1
+    return 0
+
+
 if __name__ == "__main__":
-    main()
+    arguments = parse_arguments()
+    failed = 0
+    if arguments.resume:
+        failed = run_command(resume_experiment, arguments.resume)
+    elif arguments.command == 'jobs':
+        failed = run_jobs(arguments.file)
+    elif arguments.command:
+        failed = run_command(EXPERIMENTS[arguments.experiment], **command_options(arguments))
+    else:
+        main()
+    # a scheduler running this headless sees a failed experiment, job or chart in the exit code
+    raise SystemExit(1 if wait_for_plots() + failed else 0)
@@ -0,0 +1,18 @@
+from core import evaluator as tables
+import pytest
+
+
+# The lookup tables of the standard deck, built once for the whole test run into a temporary directory,
+# the tests never write into the real cache of the user
+@pytest.fixture(scope='session')
+def standard_evaluator(tmp_path_factory):
+    return tables.HandEvaluator(str(tmp_path_factory.mktemp('tables')))
+
+
+# makes every experiment and trial of a test use those tables, worker processes included
+@pytest.fixture
+def standard_tables(standard_evaluator, monkeypatch):
+    monkeypatch.setenv('CARDSIMPLEANALYSIS_CACHE', standard_evaluator.cache_dir)
+    monkeypatch.setattr(tables, 'CACHE_DIR', standard_evaluator.cache_dir)
+    monkeypatch.setattr(tables, '_evaluator', standard_evaluator)
+    return standard_evaluator
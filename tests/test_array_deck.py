@@ -0,0 +1,70 @@
+from core.array_deck import ArrayDeck, PARTIAL_SHUFFLE_CARDS
+from core.card import Card
+from core.deck import Deck
+from core.sampler import deck_codes
+from collections import Counter
+import numpy as np
+import pytest
+
+# ArrayDeck is a drop-in for Deck, the same moves have to leave both decks holding the same cards in the same order
+
+
+def faces(deck):
+    return [card.getFace() for card in deck]
+
+
+def test_drawing_and_placing_back_keeps_the_cards_of_deck():
+    decks = [Deck(1, 13, 1), ArrayDeck(1, 13, 1)]
+    for deck in decks:
+        first, second = deck.draw_cards(), deck.draw_cards()
+        deck.place_cards(first)
+        deck.place_cards(second)
+    assert faces(decks[1]) == faces(decks[0])
+    assert sorted(faces(decks[1])) == list(range(1, 14))
+
+
+def test_a_drawn_hand_does_not_change_with_the_deck():
+    deck = ArrayDeck(1, 13, 1)
+    hand = deck.draw_cards()
+    deck.placeCardTop(Card(1, 0))
+    deck.shuffle()
+    assert hand.tolist() == list(range(9, 14))
+
+
+def test_drawing_more_cards_than_are_left():
+    deck = ArrayDeck(1, 3, 1)
+    assert len(deck.draw_cards(5)) == 3 and len(deck) == 0
+    with pytest.raises(AssertionError):
+        deck.draw_cards()
+    with pytest.raises(AssertionError):
+        deck.drawCard()
+
+
+def test_card_by_card_moves_match_deck():
+    decks = [Deck(1, 13, 2), ArrayDeck(1, 13, 2)]
+    for deck in decks:
+        top = deck.drawCard()
+        deck.placeCardBottom(top)
+        deck.addCard(Card(7, 1), 4)
+        deck.place_cards([Card(2, 0), Card(3, 0)])
+    assert [str(card) for card in decks[1]] == [str(card) for card in decks[0]]
+    assert isinstance(decks[1].draw_cards(), np.ndarray)
+
+
+# chi-square statistic of observed counts against equal expected counts
+def chi_square(counts):
+    counts = np.asarray(counts, dtype=np.float64)
+    expected = counts.sum() / len(counts)
+    return float(((counts - expected) ** 2 / expected).sum())
+
+
+def test_partial_array_shuffle_puts_every_card_on_top_equally_often():
+    deck = ArrayDeck(1, 13, 40, seed=5)
+    assert len(deck) >= PARTIAL_SHUFFLE_CARDS  # big enough for the partial shuffle
+    counts = Counter()
+    for _ in range(52000):
+        deck.shuffle(top=5)
+        counts[int(deck.pile[deck.size - 5])] += 1
+    assert sorted(deck.pile[:deck.size].tolist()) == deck_codes(1, 13, 40).tolist()
+    # 519 degrees of freedom, the 99.99% quantile is about 645
+    assert len(counts) == 520 and chi_square(list(counts.values())) < 645
@@ -0,0 +1,25 @@
+from core.cache import ResultCache, cache_key
+import os
+import pickle
+
+# The result cache stays under its size by removing the least recently used results first
+
+
+def test_the_least_recently_used_results_are_evicted_first(tmp_path):
+    size = len(pickle.dumps(bytes(1000), protocol=pickle.HIGHEST_PROTOCOL))
+    cache = ResultCache(str(tmp_path), max_bytes=int(size * 3.5), memory_entries=0)
+    # a, b and c are written in this order, a is then used again
+    for when, name in enumerate('abc', 1):
+        cache.put({'suit': name}, bytes(1000))
+        os.utime(cache._path(cache_key({'suit': name})), (when, when))
+    assert cache.get({'suit': 'a'}) == bytes(1000)
+    cache.put({'suit': 'd'}, bytes(1000))
+    kept = sorted(name for name in 'abcd' if os.path.exists(cache._path(cache_key({'suit': name}))))
+    assert kept == ['a', 'c', 'd']
+    assert cache.total == 3 * size <= cache.max_bytes
+    assert cache.get({'suit': 'b'}) is None
+
+
+def test_the_key_does_not_depend_on_the_order_of_the_configuration():
+    assert cache_key({'suit': 4, 'seed': 7}) == cache_key({'seed': 7, 'suit': 4})
+    assert cache_key({'suit': 4, 'seed': 7}) != cache_key({'suit': 4, 'seed': 8})
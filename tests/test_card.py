@@ -0,0 +1,20 @@
+from core.card import Card, encode, decode_face, decode_suit, from_code
+from core.deck import Deck
+import pytest
+
+
+def test_cards_keep_distinct_codes():
+    assert len(set(Deck(1, 255, 3))) == 3 * 255
+    with pytest.raises(AssertionError):
+        Card(256, 0)
+    with pytest.raises(AssertionError):
+        Deck(1, 300, 2)
+
+
+def test_codes_round_trip_and_cards_are_interned():
+    card = Card(13, 3)
+    assert (decode_face(card.code), decode_suit(card.code)) == (13, 3) and card.code == encode(13, 3)
+    assert from_code(card.code) is card and Card(13, 3) is card
+    assert Card(1, 2) != Card(1, 3) and hash(Card(1, 2)) == hash(from_code(encode(1, 2)))
+    with pytest.raises(AttributeError):
+        card.face = 2
@@ -0,0 +1,57 @@
+from core.array_deck import ArrayDeck
+from core.checkpoint import read_checkpoint
+from core.deck import Deck
+import main
+import pytest
+
+# A run interrupted and resumed from its checkpoint has to give exactly what an uninterrupted run gives
+
+
+# interrupts an experiment after a number of finished experiments, the way Ctrl-C would
+def interrupt_after(count):
+    done = [0]
+
+    def progress(*stats):
+        done[0] += 1
+        if done[0] == count:
+            raise KeyboardInterrupt
+    return progress
+
+
+@pytest.mark.parametrize('engine', ['list', 'array', 'batch'])
+def test_resumed_run_is_identical_to_an_uninterrupted_one(engine, tmp_path, monkeypatch, standard_tables):
+    monkeypatch.chdir(tmp_path)  # the experiments write their logs into the working directory
+    options = dict(engine=engine, attempts=200, experiments=12, seed=3, plots='off', results='off', cache=False)
+    whole = main.chances_of_hands(4, dynamic_suit=True, **options)
+    checkpoint = str(tmp_path / 'hands.ckpt')
+    with pytest.raises(KeyboardInterrupt):
+        main.chances_of_hands(4, dynamic_suit=True, checkpoint=checkpoint, checkpoint_interval=3600,
+                              progress=interrupt_after(5), **options)
+    assert main.resume_experiment(checkpoint, cache=False) == whole
+
+
+def test_resumed_run_keeps_the_means_of_its_plots(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    means = []
+    monkeypatch.setattr(main, 'render', lambda function, args, mode: means.append(args[1]))
+    options = dict(engine='list', attempts=50, experiments=9, seed=4, plots='inline', results='off')
+    main.chances_of_hands(3, **options)
+    whole, means[:] = list(means), []
+    checkpoint = str(tmp_path / 'plots.ckpt')
+    with pytest.raises(KeyboardInterrupt):
+        main.chances_of_hands(3, checkpoint=checkpoint, progress=interrupt_after(4), **options)
+    # the lists in the checkpoint are only read up to the experiments that were finished
+    assert len(read_checkpoint(checkpoint)[2]['means'][0]) >= 4
+    main.resume_experiment(checkpoint, plots='inline')
+    assert means == whole
+
+
+@pytest.mark.parametrize('engine', [Deck, ArrayDeck])
+def test_deck_snapshot_puts_the_deck_back(engine):
+    deck = engine(1, 13, 2, seed=8)
+    deck.shuffle()
+    state = deck.get_state()
+    before = [str(card) for card in deck], [str(card) for card in deck.draw_cards(7)]
+    deck.shuffle()
+    deck.set_state(state)
+    assert ([str(card) for card in deck], [str(card) for card in deck.draw_cards(7)]) == before
@@ -0,0 +1,25 @@
+from core.dealer import deal_tables
+from core.sampler import deck_codes
+import numpy as np
+
+# The dealer gives every player and every slot of a table each card of the deck equally often.
+# Everything runs on a small deck in a few seconds.
+
+
+# chi-square statistic of observed counts against equal expected counts
+def chi_square(counts):
+    counts = np.asarray(counts, dtype=np.float64)
+    expected = counts.sum() / len(counts)
+    return float(((counts - expected) ** 2 / expected).sum())
+
+
+def test_every_player_and_slot_gets_every_card_equally_often():
+    codes = deck_codes(1, 13, 4)
+    dealt, community = deal_tables(codes, 40000, players=3, hand_size=2, community=5, rng=np.random.default_rng(11))
+    slots = np.concatenate([dealt.reshape(len(dealt), -1), community], axis=1)
+    for slot in slots.T:
+        counts = np.bincount(np.searchsorted(codes, slot), minlength=len(codes))
+        # 51 degrees of freedom, the 99.99% quantile is about 96
+        assert chi_square(counts) < 96
+    # no card shows up twice at one table
+    assert all(len(set(row)) == slots.shape[1] for row in slots[:1000].tolist())
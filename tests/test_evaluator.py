@@ -0,0 +1,27 @@
+from core import hands
+from core import evaluator as tables
+from core.sampler import deck_codes, sample_hands
+import numpy as np
+import os
+
+
+def test_table_categories_match_the_batch_classifiers(standard_tables):
+    dealt = sample_hands(deck_codes(1, 13, 4), 200000, rng=np.random.default_rng(2))
+    assert np.array_equal(standard_tables.category(dealt), hands.hand_categories(dealt))
+    for mask in ('flush_mask', 'pair_mask', 'royal_flush_mask'):
+        assert np.array_equal(getattr(standard_tables, mask)(dealt), getattr(hands, mask)(dealt))
+
+
+def test_a_better_category_always_ranks_higher(standard_tables):
+    categories, ranks = np.asarray(standard_tables.categories), np.asarray(standard_tables.ranks)
+    order = np.argsort(ranks, kind='stable')
+    assert (np.diff(categories[order].astype(np.int64)) >= 0).all()
+    # the ace high straight beats the 5 high one (A, 2, 3, 4, 5)
+    broadway, wheel = np.array([[1, 10, 11, 12, 269]]), np.array([[1, 2, 3, 4, 261]])
+    assert standard_tables.rank(broadway)[0] > standard_tables.rank(wheel)[0]
+
+
+def test_tables_are_versioned_and_follow_the_cache_directory(standard_tables):
+    assert tables.get_evaluator() is standard_tables
+    assert os.path.basename(standard_tables.ranks_path) == 'hand_ranks-v{0}.npy'.format(tables.TABLE_VERSION)
+    assert os.path.dirname(standard_tables.categories_path) == standard_tables.cache_dir
@@ -0,0 +1,34 @@
+from core import hands
+from core.exact import category_counts, hand_probabilities
+from core.sampler import deck_codes
+from collections import Counter
+from fractions import Fraction
+from itertools import combinations
+import main
+import numpy as np
+import pytest
+
+# The exact engine against full enumeration of small decks, every 5 card hand is classified once
+
+SMALL_DECKS = [(1, 13, 1), (1, 6, 2), (9, 13, 3), (1, 5, 5), (1, 7, 4)]
+
+
+# every 5 card hand of a small deck, as an (n, 5) array of codes
+def all_hands(valueStart, valueEnd, numSuits):
+    return np.array(list(combinations(deck_codes(valueStart, valueEnd, numSuits).tolist(), 5)))
+
+
+@pytest.mark.parametrize('deck', SMALL_DECKS)
+def test_exact_category_counts_match_enumeration(deck):
+    counted = Counter(hands.hand_categories(all_hands(*deck)).tolist())
+    exact = {category: count for category, count in category_counts(*deck).items() if count}
+    assert dict(counted) == exact
+
+
+@pytest.mark.parametrize('deck', SMALL_DECKS)
+def test_exact_pair_and_flush_match_the_experiment_classifiers(deck):
+    dealt = all_hands(*deck)
+    flush = sum(main.is_flush(hand) for hand in dealt)
+    pair = sum(main.is_pair(hand) and not main.is_flush(hand) for hand in dealt)
+    exact = hand_probabilities(*deck)
+    assert exact == {'pair': Fraction(pair, len(dealt)), 'flush': Fraction(flush, len(dealt))}
@@ -0,0 +1,37 @@
+from core.jobs import load_jobs
+import json
+import main
+import pytest
+
+# Job files fill their defaults only into the experiments that take them, and the command line
+# only offers each experiment the options it uses
+
+
+def write_jobs(path, spec):
+    with open(path, 'w') as file:
+        json.dump(spec, file)
+    return str(path)
+
+
+def test_defaults_go_only_into_the_experiments_that_take_them(tmp_path):
+    path = write_jobs(tmp_path / 'jobs.json', {
+        'defaults': {'engine': 'batch', 'attempts': 100, 'cache': False},
+        'jobs': [{'experiment': 'royal_flush_chance', 'suit': 4, 'experiments': 2},
+                 {'experiment': 'changes_in_chance', 'trials': 3, 'sweep': {'seed': [1, 2]}}]})
+    royal, *changes = load_jobs(path, main.JOB_OPTIONS)
+    assert royal == {'experiment': 'royal_flush_chance', 'engine': 'batch', 'suit': 4, 'experiments': 2}
+    assert [job['seed'] for job in changes] == [1, 2]
+    assert all(job['attempts'] == 100 and job['cache'] is False for job in changes)
+
+
+def test_a_job_with_an_option_its_experiment_does_not_take_is_refused(tmp_path):
+    path = write_jobs(tmp_path / 'jobs.json', [{'experiment': 'proving_fairness', 'cache': False}])
+    with pytest.raises(ValueError, match='proving_fairness does not take cache'):
+        load_jobs(path, main.JOB_OPTIONS)
+
+
+def test_only_the_counting_experiments_take_exact_and_no_cache():
+    assert main.parse_arguments(['hands', '--exact', '--no-cache']).exact is True
+    assert main.parse_arguments(['changes', '--no-cache']).cache is False
+    with pytest.raises(SystemExit):
+        main.parse_arguments(['fairness', '--no-cache'])
@@ -0,0 +1,49 @@
+from core.results import ResultSink, TrialStream, load_results
+from core.stats import RunningStats
+import os
+import numpy as np
+
+# Runs written to the results store come back unchanged, and a resumed run does not count its trials twice
+
+
+def test_a_run_comes_back_as_it_was_recorded(tmp_path):
+    stats = RunningStats()
+    stats.add_all([0.25, 0.5, 0.75])
+    with ResultSink(str(tmp_path), file_format='npz') as sink:
+        run = sink.record('chances_of_hands', {'engine': 'batch', 'faces': (1, 13), 'suits': 4, 'seed': 7},
+                          {'pair': [0.25, 0.5, 0.75]}, {'pair': stats})
+    runs = load_results(str(tmp_path))
+    assert runs['run'].tolist() == [run]
+    assert (runs['faces_start'][0], runs['faces_end'][0], runs['seed'][0], runs['experiments'][0]) == (1, 13, '7', 3)
+    assert np.isnan(runs['seconds'][0])
+    summary = load_results(str(tmp_path), 'summaries', run=run)
+    assert summary['mean'].tolist() == [0.5]
+    trials = load_results(str(tmp_path), 'trials', run=run, metric='pair')
+    assert trials['trial'].tolist() == [1, 2, 3]
+    assert trials['value'].tolist() == [0.25, 0.5, 0.75]
+
+
+def test_trials_sent_again_after_a_resume_are_kept_once(tmp_path):
+    sink = ResultSink(str(tmp_path), file_format='npz')
+    first = TrialStream(sink, ('pair',), chunk=2)
+    for value in range(5):
+        first.add(pair=value)
+    # the checkpoint was taken after 2 trials, the resumed run deals trials 3 to 5 again
+    resumed = TrialStream(sink, ('pair',), run=first.run, sent=2, chunk=2)
+    for value in range(2, 6):
+        resumed.add(pair=value)
+    resumed.finish('chances_of_hands', {'engine': 'list'})
+    sink.close()
+    trials = load_results(str(tmp_path), 'trials', run=first.run)
+    assert trials['trial'].tolist() == [1, 2, 3, 4, 5, 6]
+    assert trials['value'].tolist() == [0, 1, 2, 3, 4, 5]
+    assert load_results(str(tmp_path))['experiments'].tolist() == [6]
+
+
+def test_a_flush_writes_no_parts_for_tables_without_rows(tmp_path):
+    sink = ResultSink(str(tmp_path), file_format='npz')
+    sink.add_trials('run', 'pair', [0.5, 0.25])
+    sink.flush()
+    assert [name.split('-')[0] for name in os.listdir(str(tmp_path))] == ['trials']
+    sink.flush()
+    assert len(os.listdir(str(tmp_path))) == 1
@@ -0,0 +1,20 @@
+from core.runner import run_experiments, spawn_seeds, child_seed
+from core.trials import hands_trial
+import numpy as np
+
+# Every experiment gets its own seed, so a run gives the same results on any number of workers
+
+
+def test_results_do_not_depend_on_the_number_of_workers(standard_tables):
+    args = ((1, 13), 4, 500)
+    alone = run_experiments(hands_trial, args, 12, seed=7, workers=1)
+    assert run_experiments(hands_trial, args, 12, seed=7, workers=3) == alone
+    # a run that starts part way gives the same experiments as the full run from there on
+    assert run_experiments(hands_trial, args, 12, seed=7, workers=2, start=5) == alone[5:]
+
+
+def test_child_seeds_are_the_spawned_seeds():
+    root = np.random.SeedSequence(42)
+    spawned = spawn_seeds(np.random.SeedSequence(42), 5)
+    assert [child_seed(root, index).generate_state(2).tolist() for index in range(5)] == \
+        [seed.generate_state(2).tolist() for seed in spawned]
@@ -0,0 +1,52 @@
+from core.stats import RunningStats, StoppingRule
+import main
+import numpy as np
+import pytest
+
+
+def summary_of(values):
+    return RunningStats().add_all(values)
+
+
+def test_added_values_give_the_numpy_statistics():
+    values = np.random.default_rng(1).normal(3, 2, 1000)
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+    assert stats.count == len(values)
+    assert stats.mean == pytest.approx(values.mean())
+    assert stats.variance() == pytest.approx(values.var())
+    assert stats.std(ddof=1) == pytest.approx(values.std(ddof=1))
+    assert (stats.min, stats.max) == (values.min(), values.max())
+
+
+def test_batches_and_merged_summaries_equal_one_summary():
+    values = np.random.default_rng(2).exponential(1, 999)
+    whole = summary_of(values)
+    merged = RunningStats()
+    for part in np.array_split(values, 7):
+        merged.merge(summary_of(part))
+    one_by_one = RunningStats()
+    for value in values:
+        one_by_one.add(value)
+    for stats in (merged, one_by_one):
+        assert stats.count == whole.count
+        assert stats.mean == pytest.approx(whole.mean)
+        assert stats.m2 == pytest.approx(whole.m2)
+        assert (stats.min, stats.max) == (whole.min, whole.max)
+
+
+def test_empty_summaries_change_nothing():
+    stats = summary_of([1.0, 2.0, 4.0])
+    stats.merge(RunningStats()).add_all([])
+    assert (stats.count, stats.mean) == (3, pytest.approx(7 / 3))
+    assert RunningStats().merge(summary_of([5.0])).mean == 5.0
+    assert np.isnan(RunningStats().variance()) and RunningStats().half_width() == float('inf')
+
+
+def test_a_run_that_ends_at_its_experiment_limit_says_so():
+    rule = StoppingRule(ci_halfwidth=1e-9)
+    assert not rule.done(10, 1000, [0.5])
+    assert main.describe_samples(10, 100, rule)[-1] == 'Stopped because: experiment limit reached'
+    rule.done(10, 1000, [0.0])
+    assert main.describe_samples(10, 100, rule)[-1] == 'Stopped because: target precision reached'